@@ -0,0 +1,155 @@
+"""
+Benchmark module comparing the trie backends of strands_graph.py.
+
+For every backend this script measures the memory held by a trie built from generated reads, how fast reads are
+inserted and how long the full overlap graph construction takes. It reuses the read generation of main.py.
+"""
+
+import time
+import random
+import argparse
+import tracemalloc
+from main import read_fasta, generate_reads
+from strands_graph import Graph, TRIE_BACKENDS, encode_strand, first_edge_within
+
+
+def build_trie(backend: str, reads: list[str], max_depth: int | None = None):
+    """
+    Builds a trie of the given backend by inserting every read, encoding the reads first for backends on base codes.
+    """
+    trie = TRIE_BACKENDS[backend]() if max_depth is None else TRIE_BACKENDS[backend](max_depth)
+    if trie.encoded:
+        reads = [encode_strand(read) for read in reads]
+    for read in reads:
+        trie.insert_strand(read)
+    return trie
+
+
+def measure_memory(backend: str, reads: list[str], max_depth: int | None = None) -> int:
+    """
+    Returns the number of bytes still allocated by a trie of the given backend after inserting all reads.
+    """
+    tracemalloc.start()
+    trie = build_trie(backend, reads, max_depth)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del trie
+    return size
+
+
+def measure_bulk_load(backend: str, reads: list[str]) -> float | None:
+    """
+    Returns the bulk loading throughput in reads per second, or None if the backend has no bulk loader.
+    """
+    trie_class = TRIE_BACKENDS[backend]
+    if not hasattr(trie_class, "bulk_load"):
+        return None
+    start = time.time()
+    trie_class.bulk_load([encode_strand(read) for read in reads])
+    return len(reads) / (time.time() - start)
+
+
+def measure_throughput(backend: str, reads: list[str], allow_mis_matches: int,
+                       skip_graph: bool = False) -> tuple[float, float | None]:
+    """
+    Returns the insertion throughput in reads per second and the seconds taken to build the full overlap graph,
+    or None instead of the latter when skip_graph is set.
+    """
+    start = time.time()
+    build_trie(backend, reads)
+    insert_time = time.time() - start
+
+    if skip_graph:
+        return len(reads) / insert_time, None
+    start = time.time()
+    Graph().load_from_strands(reads, allow_mis_matches, trie_backend=backend)
+    graph_time = time.time() - start
+    return len(reads) / insert_time, graph_time
+
+
+def measure_recall(reads: list[str], allow_mis_matches: int, max_depth: int) -> float:
+    """
+    Returns the fraction of the overlaps found by the full array trie that a trie capped at max_depth finds too.
+    """
+    full, capped = Graph(), Graph()
+    full.load_from_strands(reads, allow_mis_matches, trie_backend="array")
+    capped.load_from_strands(reads, allow_mis_matches, trie_backend="array", max_depth=max_depth)
+    expected = {(v.sequence, e.sequence, overlap) for v in full.vertices for e, overlap, _ in v.connected_vertices}
+    found = {(v.sequence, e.sequence, overlap) for v in capped.vertices for e, overlap, _ in v.connected_vertices}
+    return len(expected & found) / len(expected) if expected else 1.0
+
+
+def measure_sweep(reads: list[str], allow_mis_matches: int) -> list[tuple[int, bool]]:
+    """
+    Builds the graph once with mismatch levels and once per allowance up to allow_mis_matches. For every allowance,
+    returns the number of vertices whose followed edge differs between the two and whether they assemble the same
+    sequence.
+    """
+    levels = Graph()
+    levels.load_from_strands(reads, allow_mis_matches, mismatch_levels=True)
+    level_vertices = {v.sequence: v for v in levels.vertices}
+    results = []
+    for allowance in range(allow_mis_matches + 1):
+        separate = Graph()
+        separate.load_from_strands(reads, allowance)
+        differing = 0
+        for v in separate.vertices:
+            expected = v.connected_vertices[0] if v.connected_vertices else None
+            found = first_edge_within(level_vertices[v.sequence].connected_vertices, allowance)
+            differing += (expected and (expected[0].sequence, expected[1])) != (found and (found[0].sequence, found[1]))
+        same_sequence = separate.get_sequenced_result() == levels.get_sequenced_result(allow_mis_matches=allowance)
+        results.append((differing, same_sequence))
+    return results
+
+
+def main() -> None:
+    """
+    Main function to parse arguments, generate reads and print the comparison table.
+    """
+    parser = argparse.ArgumentParser(description="Compare memory and throughput of the trie backends.")
+    parser.add_argument("-f", "--fasta", type=str, default="sequence.fasta", help="Path to the FASTA file containing the genome sequence.")
+    parser.add_argument("-l", "--read_length", type=int, default=100, help="Length of each read (default: 100).")
+    parser.add_argument("-N", "--num_reads", type=int, default=3000, help="Desired amount of reads.")
+    parser.add_argument("-p", "--error_prob", type=float, default=0.01, help="Base mismatch probability (default: 0.01).")
+    parser.add_argument("-a", "--allow_mis_matches", type=int, default=2, help="How many miss matches to allow when comparing suffix to prefix.")
+    parser.add_argument("-b", "--backends", type=str, nargs="+", choices=list(TRIE_BACKENDS), default=list(TRIE_BACKENDS),
+                        help="Trie backends to compare (default: all).")
+    parser.add_argument("-d", "--max_depth", type=int, default=None,
+                        help="Also compare the array trie capped at this depth, reporting memory saved and overlap recall")
+    parser.add_argument("--sweep", action="store_true",
+                        help="Also check that a graph built once with mismatch levels matches separate builds for every allowance up to -a")
+    parser.add_argument("--skip_graph", action="store_true", help="Only measure trie construction, skipping the overlap graph")
+    parser.add_argument("-s", "--seed", type=int, default=207732132, help="The seed to run the program with")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    genome = read_fasta(args.fasta)
+    reads = generate_reads(genome, args.num_reads, args.read_length, args.error_prob)
+
+    print(f"{'backend':<10} {'memory (MB)':>12} {'bytes/base':>11} {'inserts/s':>11} {'bulk/s':>11} {'graph (s)':>10}")
+    for backend in args.backends:
+        memory = measure_memory(backend, reads)
+        inserts_per_second, graph_time = measure_throughput(backend, reads, args.allow_mis_matches, args.skip_graph)
+        bulk_per_second = measure_bulk_load(backend, reads)
+        bytes_per_base = memory / (args.num_reads * args.read_length)
+        bulk = f"{bulk_per_second:>11.0f}" if bulk_per_second is not None else f"{'-':>11}"
+        graph = f"{graph_time:>10.2f}" if graph_time is not None else f"{'-':>10}"
+        print(f"{backend:<10} {memory / 2 ** 20:>12.2f} {bytes_per_base:>11.1f} {inserts_per_second:>11.0f} {bulk} {graph}")
+
+    if args.max_depth is not None:
+        full_memory = measure_memory("array", reads)
+        capped_memory = measure_memory("array", reads, args.max_depth)
+        recall = measure_recall(reads, args.allow_mis_matches, args.max_depth)
+        print()
+        print(f"array trie capped at depth {args.max_depth}: {capped_memory / 2 ** 20:.2f} MB, "
+              f"saving {(1 - capped_memory / full_memory) * 100:.1f}% of memory, overlap recall {recall * 100:.2f}%")
+
+    if args.sweep:
+        print()
+        for allowance, (differing, same_sequence) in enumerate(measure_sweep(reads, args.allow_mis_matches)):
+            print(f"-a {allowance} from a sweep built with -a {args.allow_mis_matches}: {differing} vertices follow "
+                  f"other edges than a separate build, {'same' if same_sequence else 'different'} sequence")
+
+
+if __name__ == "__main__":
+    main()
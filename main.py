@@ -10,7 +10,7 @@ import time
 import tqdm
 import random
 import argparse
-from strands_graph import Graph, timings, timer
+from strands_graph import CompactGraph, Graph, OVERLAP_ENGINES, TRIE_BACKENDS, counters, select_overlap_engine, timings, timer
 
 
 def read_fasta(filename: str) -> str:
@@ -74,7 +74,8 @@ def iterative_test_sequencing(args: argparse.Namespace, experiment_title: str, g
                               print_results: bool = True) -> None:
     """
     Iteratively tests the genome assembly process by generating reads, assembling them into a graph,
-    and evaluating performance.
+    and evaluating performance. With args.sweep_mis_matches, each graph is built once and assembled for every
+    allowance from 0 to allow_mis_matches.
     """
     if not args.hide_progress_bar:
         progress_bar = tqdm.tqdm(
@@ -83,36 +84,59 @@ def iterative_test_sequencing(args: argparse.Namespace, experiment_title: str, g
             bar_format="{l_bar}{bar} {n_fmt}/{total_fmt} | {elapsed} elapsed, {remaining} remaining, {rate_fmt}"
         )
 
-    recall = 0
-    precision = 0
-    iou = 0
-    for _ in range(testing_iterations):
+    overlap_engine = args.overlap_engine
+    if overlap_engine == "auto":
+        memory_budget = None if args.memory_budget is None else int(args.memory_budget * 2 ** 20)
+        overlap_engine = select_overlap_engine(num_reads, args.read_length, allow_mis_matches, memory_budget,
+                                               args.seed_length, args.window, args.max_edits)
+
+    allowances = list(range(allow_mis_matches + 1)) if args.sweep_mis_matches else [allow_mis_matches]
+    recall = dict.fromkeys(allowances, 0)
+    precision = dict.fromkeys(allowances, 0)
+    iou = dict.fromkeys(allowances, 0)
+    for iteration in range(testing_iterations):
         if not args.hide_progress_bar:
             progress_bar.update(1)
         error_reads = generate_reads(genome, num_reads, args.read_length, error_prob)
-        G = Graph()
+        options = dict(trie_backend=args.trie_backend, best_first=args.best_first, cache_size=args.cache_size,
+                       failure_links=args.failure_links,
+                       bulk_load=args.bulk_load, max_depth=args.max_depth,
+                       index_path=f"{args.index_file}.{iteration}" if args.index_file else None,
+                       overlap_engine=overlap_engine, seed_length=args.seed_length, window=args.window,
+                       max_edits=args.max_edits)
         with timer("create graph"):
-            G.load_from_strands(error_reads, allow_mis_matches)
+            if args.top_k is None:
+                G = Graph()
+                G.load_from_strands(error_reads, allow_mis_matches, workers=args.workers,
+                                    mismatch_levels=args.sweep_mis_matches, **options)
+            else:
+                G = CompactGraph()
+                G.load_from_strands(error_reads, allow_mis_matches, top_k=args.top_k, **options)
         
-        with timer("sequence"):
-            sequence = G.get_sequenced_result()
-        
-        with timer("eval"):
-            r, p, i = global_alignment(genome, sequence)
-        
-        recall += r / testing_iterations
-        precision += p / testing_iterations
-        iou += i / testing_iterations
+        for allowance in allowances:
+            with timer("sequence"):
+                sequence = G.get_sequenced_result(allow_mis_matches=allowance if args.sweep_mis_matches else None)
+            
+            with timer("eval"):
+                r, p, i = global_alignment(genome, sequence)
+            
+            recall[allowance] += r / testing_iterations
+            precision[allowance] += p / testing_iterations
+            iou[allowance] += i / testing_iterations
 
     if not args.hide_progress_bar:
         progress_bar.close()
     
     if print_results:
-        print()
-        print(experiment_title, "results:")
-        print(f"recall: {recall}")
-        print(f"precision: {precision}")
-        print(f"iou: {iou}")
+        for allowance in allowances:
+            print()
+            if args.sweep_mis_matches:
+                print(experiment_title, f"results with -a {allowance}:")
+            else:
+                print(experiment_title, "results:")
+            print(f"recall: {recall[allowance]}")
+            print(f"precision: {precision[allowance]}")
+            print(f"iou: {iou[allowance]}")
 
 
 def main() -> None:
@@ -127,11 +151,45 @@ def main() -> None:
     parser.add_argument("-i", "--testing_iterations", type=int, default=100, help="Number of iterations to test the quality of the algorithm. Only for erroneous reads")
     parser.add_argument("-a", "--allow_mis_matches", type=str, choices=["0", "1", "2", "3", "4", "log"], default="2", 
                         help="How many miss matches to allow when comparing suffix to prefix. Only for erroneous reads")
+    parser.add_argument("-t", "--trie_backend", type=str, choices=list(TRIE_BACKENDS), default="object",
+                        help="Trie implementation used for suffix-prefix matching (default: object).")
+    parser.add_argument("-o", "--overlap_engine", "--overlap-engine", type=str, choices=["auto"] + list(OVERLAP_ENGINES), default="trie",
+                        help="Engine finding the suffix-prefix overlaps, 'auto' picking one by -N, -l, -a and --memory_budget; the trie options apply only to 'trie' (default: trie).")
+    parser.add_argument("--memory_budget", type=float, default=None,
+                        help="Memory budget in MB the automatically selected overlap engine should fit (default: unlimited)")
+    parser.add_argument("--best_first", action="store_true",
+                        help="Match each suffix to the prefix needing the fewest miss matches instead of the first one found. This changes the results, and lowers the iou on the PhiX reads (0.65 instead of 0.98 at -a 2)")
+    parser.add_argument("--failure_links", action="store_true",
+                        help="Find the exact overlaps of a read in one Aho-Corasick scan, faster on erroneous reads and slower on clean ones (object and array backends only)")
+    parser.add_argument("-c", "--cache_size", type=int, default=0,
+                        help="Size of the LRU cache of suffix queries, 0 disables it (default: 0).")
+    parser.add_argument("--bulk_load", action="store_true", help="Build the trie from the sorted reads in one sweep (array backend only)")
+    parser.add_argument("-d", "--max_depth", type=int, default=None,
+                        help="Index only this many bases of every read, verifying longer overlaps against the reads (array backend only)")
+    parser.add_argument("-k", "--seed_length", type=int, default=None,
+                        help="Length of the prefix seeds of the kmer and hamming engines (default: shortest overlap + 1) or of the minimizers (default: 15)")
+    parser.add_argument("-e", "--max_edits", type=int, default=None,
+                        help="Accept overlaps within this many substitutions, insertions and deletions instead of -a miss matches (kmer engine only)")
+    parser.add_argument("-w", "--window", type=int, default=None,
+                        help="Number of consecutive k-mers each minimizer is chosen from (minimizer overlap engine only, default: 10)")
+    parser.add_argument("--top_k", type=int, default=None,
+                        help="Keep this many longest overlaps of every read in a compact graph instead of one per read")
+    parser.add_argument("--sweep_mis_matches", action="store_true",
+                        help="Build each graph once and report the results of every allowance from 0 up to -a")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Number of processes searching overlaps in parallel (default: 1)")
+
+    parser.add_argument("--index_file", type=str, default=None,
+                        help="Path prefix of on-disk tries, one per iteration, reused by later runs with the same reads (array backend only)")
 
     parser.add_argument("--hide_progress_bar", action="store_true", help="Hides the progress bar")
     parser.add_argument("--hide_timing", action="store_true", help="Hides the timing resultsprogress bar")
     parser.add_argument("-s", "--seed", type=int, default=207732132, help="The seed to run the program with")
     args = parser.parse_args()
+    if args.top_k is not None and args.sweep_mis_matches:
+        parser.error("--sweep_mis_matches needs the mismatch levels of the default graph, not --top_k")
+    if args.top_k is not None and args.workers > 1:
+        parser.error("--workers only parallelizes the default graph, not --top_k")
 
     random.seed(args.seed)
     
@@ -154,6 +212,8 @@ def main() -> None:
         print(f"took {total:.2f} seconds to run")
         for key, value in timings.items():
             print(f"{key} was {value / total * 100:.2f}% of runtime, taking {value / args.testing_iterations:.3f} seconds to run on average.")
+        for key, value in counters.items():
+            print(f"{key} were {value}, {value / args.testing_iterations:.1f} per run on average.")
     
 
 if __name__ == "__main__":
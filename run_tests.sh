@@ -25,9 +25,5 @@ echo "-p 0.01 -a 2 -l 150 -N 3000 -i 100"
 python3 main.py -p 0.01 -a 2 -l 150 -N 3000 -i 100
 echo ""
 echo "### Effect of number of allowed misalignments (k) ###"
-echo "-p 0.01 -a 0 -l 100 -N 3000 -i 100"
-python3 main.py -p 0.01 -a 0 -l 100 -N 3000 -i 100
-echo "-p 0.01 -a 1 -l 100 -N 3000 -i 100"
-python3 main.py -p 0.01 -a 1 -l 100 -N 3000 -i 100
-echo "-p 0.01 -a 3 -l 100 -N 3000 -i 100"
-python3 main.py -p 0.01 -a 3 -l 100 -N 3000 -i 100
\ No newline at end of file
+echo "-p 0.01 -a 3 -l 100 -N 3000 -i 100 --sweep_mis_matches"
+python3 main.py -p 0.01 -a 3 -l 100 -N 3000 -i 100 --sweep_mis_matches
\ No newline at end of file
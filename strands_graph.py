@@ -6,11 +6,29 @@ and constructing a graph of genome read overlaps. It also provides utilities for
 timing specific operations.
 """
 
+import os
 import math
+import mmap
 import time
+import struct
+import hashlib
+import tempfile
+import warnings
+import multiprocessing
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
 from contextlib import contextmanager
+from itertools import accumulate, islice, repeat
+from typing import Callable, Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 timings = {}
+counters = {}
 
 
 @contextmanager
@@ -25,22 +43,33 @@ def timer(key: str):
     timings[key] += time.time() - start
 
 
+def count(key: str, amount: int = 1) -> None:
+    """
+    Adds an amount to a named counter, reported next to the timings.
+    """
+    if key not in counters:
+        counters[key] = 0
+    counters[key] += amount
+
+
 class Vertex:
     """
     Represents a vertex in the overlap graph, holding a genome read sequence and connections to other vertices.
     """
-    def __init__(self, sequence: str) -> None:
+    def __init__(self, sequence: str | bytes) -> None:
         """
-        Initializes a Vertex with the given sequence.
+        Initializes a Vertex with the given sequence, either as a string or as base codes.
         """
-        self.sequence: str = sequence
-        self.connected_vertices: list['Vertex'] = []
+        self.sequence: str | bytes = sequence
+        self.connected_vertices: list[tuple['Vertex', int, int]] = []
 
 
 class TrieNode:
     """
     Represents a node in a trie used for fast suffix-prefix matching of genome reads.
     """
+    encoded = False
+
     def __init__(self, extra: Vertex = None, count: int = 0) -> None:
         """
         Initializes a TrieNode.
@@ -51,6 +80,8 @@ class TrieNode:
         self.T: 'TrieNode' = None
         self.count: int = count
         self.extra: Vertex | None = extra
+        self.fail: TrieNode | None = None
+        self.depth: int = 0
 
     def str_aux(self):
         """
@@ -89,30 +120,90 @@ class TrieNode:
         """
         return "\n".join(self.str_aux()[0])
 
-    def insert_strand(self, strand: str, extra: Vertex | None = None, new_extra: bool = False) -> Vertex | None:
+    def insert_strand(self, strand: str, extra: Vertex | None = None) -> Vertex | None:
         """
-        Inserts a strand into the trie and associates it with a Vertex.
+        Inserts a strand into the trie and associates it with a Vertex, returned only if the strand is new.
+        Walks the trie with an index cursor over the strand, so only the new nodes are allocated and reads of any
+        length can be inserted.
         """
-        self.count += 1
-        if self.extra is None:
-            self.extra = extra if extra is not None else Vertex(strand)
-            new_extra = True
-        
-        if not strand:
-            return self.extra if new_extra else None
-        
-        first_char = strand[0]
-        next_node: TrieNode | None = getattr(self, first_char)
-        if next_node is None:  # Opening recursion for faster runtimes.
-            current = self
-            extra = self.extra if new_extra else Vertex(strand)
-            for c in strand:
-                next_node = TrieNode(extra, 1)
-                setattr(current, c, next_node)
-                current = next_node
-            return extra
-        
-        return next_node.insert_strand(strand[1:], self.extra if new_extra else None, new_extra=new_extra)
+        node = self
+        node.count += 1
+        vertex = None
+        if node.extra is None:
+            vertex = node.extra = extra if extra is not None else Vertex(strand)
+
+        for i in range(len(strand)):
+            next_node: TrieNode | None = getattr(node, strand[i])
+            if next_node is None:
+                if vertex is None:
+                    vertex = extra if extra is not None else Vertex(strand)
+                for j in range(i, len(strand)):
+                    next_node = TrieNode(vertex, 1)
+                    setattr(node, strand[j], next_node)
+                    node = next_node
+                return vertex
+            node = next_node
+            node.count += 1
+
+        return vertex
+
+    def build_failure_links(self) -> None:
+        """
+        Adds Aho-Corasick failure links to the trie rooted at this node. The failure link of a node points at the node
+        of the longest proper suffix of its path that is also a path in the trie. Must be rebuilt after insertions.
+        """
+        self.fail = self
+        self.depth = 0
+        queue = deque([self])
+        while queue:
+            node = queue.popleft()
+            for char in "ACGT":
+                child: TrieNode | None = getattr(node, char)
+                if child is None:
+                    continue
+                child.depth = node.depth + 1
+                fail = node.fail
+                while fail is not self and getattr(fail, char) is None:
+                    fail = fail.fail
+                target = getattr(fail, char)
+                child.fail = target if target is not None and target is not child else self
+                queue.append(child)
+
+    def suffix_matches(self, strand: str) -> Iterator[tuple[int, Vertex]]:
+        """
+        Yields (length, Vertex) for every suffix of the strand that is a path in the trie, longest first.
+        The strand is scanned once, following the failure links added by build_failure_links.
+        """
+        node = self
+        for char in strand:
+            while node is not self and getattr(node, char) is None:
+                node = node.fail
+            node = getattr(node, char) or self
+        while node is not self:
+            yield node.depth, node.extra
+            node = node.fail
+
+    def best_first_search(self, strand: str, allow_mis_matches: int = 0, start: int = 0) -> Vertex | None:
+        """
+        Searches for strand[start:] in the trie, returning the match needing the fewest mismatches.
+        The Hamming ball is explored one mismatch count at a time with explicit stacks and without copying strings.
+        """
+        buckets = [[(self, start)]] + [[] for _ in range(allow_mis_matches)]
+        for mismatches, stack in enumerate(buckets):
+            while stack:
+                node, i = stack.pop()
+                while node is not None:
+                    if i == len(strand):
+                        return node.extra
+                    char = strand[i]
+                    i += 1
+                    if mismatches < allow_mis_matches:
+                        for other in "ACGT":
+                            child = getattr(node, other)
+                            if other != char and child is not None:
+                                buckets[mismatches + 1].append((child, i))
+                    node = getattr(node, char)
+        return None
 
     def search(self, strand: str, allow_mis_matches: int = 0) -> Vertex | None:
         """
@@ -133,65 +224,2280 @@ class TrieNode:
         return node.extra
 
 
-class Graph:
+_ENCODE_TABLE = bytes.maketrans(b"ACGT", bytes(range(4)))
+_DECODE_TABLE = bytes.maketrans(bytes(range(4)), b"ACGT")
+_CODES = tuple(bytes([code]) for code in range(4))
+
+
+def encode_strand(strand: str) -> bytes:
     """
-    Represents an overlap graph where nodes are genome read vertices and edges represent overlaps.
+    Translates a DNA strand into compact base codes, one byte per base with A, C, G, T mapped to 0-3.
+    """
+    return strand.encode("ascii").translate(_ENCODE_TABLE)
+
+
+def decode_strand(codes: bytes) -> str:
+    """
+    Translates base codes produced by encode_strand back into a DNA strand.
+    """
+    return codes.translate(_DECODE_TABLE).decode("ascii")
+
+
+def _common_prefix_length(first: bytes, second: bytes) -> int:
+    """
+    Returns the length of the longest common prefix of two code strings, comparing halving slices in C.
+    """
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+_PACK_TABLES = tuple(bytes((value << shift) & 0xFF for value in range(256)) for shift in (0, 2, 4, 6))
+
+
+def pack_strand(strand: bytes) -> int:
+    """
+    Packs an encoded strand into an integer holding base i in bits 2i and 2i + 1, so that shifting it right by 2i
+    bits gives strand[i:].
+    """
+    padded = strand + bytes(-len(strand) % 4)
+    packed = 0
+    for lane, table in enumerate(_PACK_TABLES):
+        packed |= int.from_bytes(padded[lane::4].translate(table), "little")
+    return packed
+
+
+def packed_mismatches(first: int, second: int, length: int) -> int:
+    """
+    Counts the positions among the first length bases where two packed strands differ: the XOR of the strands is
+    folded onto the low bit of each base and the set bits are counted.
+    """
+    differs = first ^ second
+    return ((differs | differs >> 1) & ((1 << 2 * length) - 1) // 3).bit_count()
+
+
+_EQUAL_TABLES = tuple(bytes.maketrans(b"\x00\x01\x02\x03",
+                                      b"".join(b"1" if other == code else b"0" for other in range(4)))
+                      for code in range(4))
+
+
+def pattern_masks(strand: bytes) -> tuple[int, ...]:
+    """
+    Returns, for each base code, the mask of the positions of an encoded strand holding it, bit i standing for
+    strand[i], as used by prefix_edit_distance.
+    """
+    reverse = strand[::-1]
+    return tuple(int(reverse.translate(table) or b"0", 2) for table in _EQUAL_TABLES)
+
+
+def prefix_edit_distance(masks: tuple[int, ...], pattern_length: int, text: bytes, max_edits: int) -> tuple[int, int]:
+    """
+    Aligns the whole text with a prefix of a pattern of pattern_length bases given by its pattern_masks, counting
+    substitutions, insertions and deletions. Returns (edits, prefix length) for the prefix needing the fewest edits,
+    the one closest to the text's length on ties, among those within max_edits of the text's length. edits exceeds
+    max_edits when none of them is close enough.
+
+    Uses Myers' bit-parallel algorithm: the vertical differences of a whole DP column are held in two integers and
+    updated per text base in a constant number of operations, the top row growing by one per base since the text
+    is aligned from its start.
+    """
+    full = (1 << pattern_length) - 1
+    positive, negative = full, 0
+    for code in text:
+        equal = masks[code]
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & full)
+        horizontal_negative = positive & horizontal
+        horizontal_positive = (horizontal_positive << 1 | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & full)
+        negative = horizontal_positive & vertical
+
+    best_edits, best_length = max_edits + 1, 0
+    for length in range(max(0, len(text) - max_edits), min(pattern_length, len(text) + max_edits) + 1):
+        prefix = (1 << length) - 1
+        edits = len(text) + (positive & prefix).bit_count() - (negative & prefix).bit_count()
+        if edits < best_edits or edits == best_edits and abs(length - len(text)) < abs(best_length - len(text)):
+            best_edits, best_length = edits, length
+    return best_edits, best_length
+
+
+_INDEX_MAGIC = b"OVLPTRIE"
+_INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct("<8sII3Q32s")
+
+
+def _strands_digest(strands: list[bytes]) -> bytes:
+    """
+    Returns a digest identifying a list of encoded strands, used to match them with a saved index.
     """
+    return hashlib.blake2b(b"\x04".join(strands), digest_size=32).digest()
+
+
+class ArrayTrie:
+    """
+    Prefix trie with the same semantics as TrieNode, stored in flat integer arrays instead of one object per base.
+
+    Node n keeps its children in children[4 * n: 4 * n + 4] (0 meaning no child, since the root is never a child),
+    the number of strands passing through it in counts[n] and the index of its owning Vertex in owners[n].
+    Strands are given as base codes (see encode_strand).
+
+    With max_depth set, only the first max_depth bases of every strand are indexed. The leaves at that depth keep
+    buckets of the strands continuing past them, and longer queries are completed by verifying the tails of the
+    bucket's strands against the read store.
+    """
+    encoded = True
+
+    def __init__(self, max_depth: int | None = None) -> None:
+        """
+        Initializes an ArrayTrie holding only the root node, optionally capped at max_depth.
+        """
+        self.children: array = array("i", [0, 0, 0, 0])
+        self.counts: array = array("I", [0])
+        self.owners: array = array("i", [-1])
+        self.fail: array | None = None
+        self.depths: array | None = None
+        self.max_depth: int | None = max_depth
+        self.buckets: dict[int, list[int]] = {}
+        self.packed_tails: dict[int, int] = {}
+        self.vertices: list[Vertex] = []
+
+    def __len__(self) -> int:
+        """
+        Returns the number of nodes in the trie.
+        """
+        return len(self.counts)
+
+    @classmethod
+    def bulk_load(cls, strands: list[bytes]) -> 'ArrayTrie':
+        """
+        Builds the trie of the strands in one left-to-right sweep over them in sorted order, opening only the nodes
+        past the longest common prefix with the previous strand. Owners and counts are then settled bottom-up, so
+        the trie and its vertices are the same as after inserting the strands one by one.
+        """
+        trie = cls()
+        if not strands:
+            return trie
+        children, counts, owners = trie.children, trie.counts, trie.owners
+        parents = array("i", [0])
+        ends = array("i", bytes(4 * len(strands)))
+        path = array("i", [0])
+        previous = b""
+        owners[0] = len(strands)
+        for index in sorted(range(len(strands)), key=strands.__getitem__):
+            strand = strands[index]
+            shared = _common_prefix_length(previous, strand)
+            node = path[shared]
+            del path[shared + 1:]
+            first, opened = len(counts), len(strand) - shared
+            if opened:
+                children.frombytes(bytes(16 * opened))
+                counts.frombytes(bytes(4 * opened))
+                owners.extend(repeat(index, opened))
+                parents.append(node)
+                parents.extend(range(first, first + opened - 1))
+                path.extend(range(first, first + opened))
+                for depth in range(shared, len(strand)):
+                    children[4 * node + strand[depth]] = node = first + depth - shared
+            counts[node] += 1
+            ends[index] = node
+            if index < owners[node]:
+                owners[node] = index
+            previous = strand
+
+        for node in range(len(counts) - 1, 0, -1):
+            parent = parents[node]
+            counts[parent] += counts[node]
+            if owners[node] < owners[parent]:
+                owners[parent] = owners[node]
+
+        vertex_indices = array("i", bytes(4 * len(strands)))
+        for index, strand in enumerate(strands):
+            if owners[ends[index]] == index:
+                vertex_indices[index] = trie._new_vertex(strand)
+        for node in range(len(owners)):
+            owners[node] = vertex_indices[owners[node]]
+        return trie
+
+    def save(self, path: str, digest: bytes = b"", num_strands: int = 0) -> None:
+        """
+        Writes the trie and its read store to a flat binary file that load can memory-map. The digest and the number
+        of strands the trie was built from are stored in the header, so callers can check what the file indexes. The
+        file is written next to path and then renamed over it, so processes mapping an earlier index keep theirs.
+        """
+        if self.max_depth is not None:
+            raise ValueError("Depth-capped tries cannot be saved")
+        reads = [vertex.sequence for vertex in self.vertices]
+        offsets = array("q", [0])
+        offsets.extend(accumulate(len(read) for read in reads))
+        has_fail = self.fail is not None
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, has_fail, len(self), len(reads),
+                                              num_strands, digest))
+                file.write(offsets.tobytes())
+                columns = (self.children, self.counts, self.owners) + ((self.fail, self.depths) if has_fail else ())
+                for column in columns:
+                    file.write(column.tobytes())
+                file.write(b"".join(reads))
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> 'ArrayTrie':
+        """
+        Memory-maps a trie written by save. The arrays are read-only views of the file, so the trie can be searched
+        right away, but not inserted into.
+        """
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        if len(view) < _INDEX_HEADER.size:
+            raise ValueError(f"{path} is not an overlap index")
+        magic, version, has_fail, nodes, vertices, num_strands, digest = _INDEX_HEADER.unpack_from(view)
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION:
+            raise ValueError(f"{path} is not an overlap index")
+        columns_size = 8 * (vertices + 1) + 4 * nodes * (8 if has_fail else 6)
+        if len(view) < _INDEX_HEADER.size + columns_size:
+            raise ValueError(f"{path} is truncated")
+
+        position = _INDEX_HEADER.size
+        def take(typecode: str, length: int) -> memoryview:
+            nonlocal position
+            start, position = position, position + struct.calcsize(typecode) * length
+            return view[start: position].cast(typecode)
+
+        trie = cls()
+        offsets = take("q", vertices + 1)
+        trie.children, trie.counts, trie.owners = take("i", 4 * nodes), take("I", nodes), take("i", nodes)
+        if has_fail:
+            trie.fail, trie.depths = take("i", nodes), take("i", nodes)
+        if len(view) < position + offsets[-1]:
+            raise ValueError(f"{path} is truncated")
+        trie.vertices = [Vertex(bytes(view[position + offsets[i]: position + offsets[i + 1]])) for i in range(vertices)]
+        trie.mapping, trie.digest, trie.num_strands = mapping, digest, num_strands
+        return trie
+
+    def _new_vertex(self, strand: bytes) -> int:
+        """
+        Creates a Vertex for the strand and returns its index in self.vertices.
+        """
+        self.vertices.append(Vertex(strand))
+        return len(self.vertices) - 1
+
+    def insert_strand(self, strand: bytes) -> Vertex | None:
+        """
+        Inserts a strand into the trie, returning its new Vertex only if the strand is not a prefix of an earlier
+        strand. In a depth-capped trie, strands longer than max_depth are added to the bucket of their leaf.
+        """
+        children, counts, owners = self.children, self.counts, self.owners
+        owner = -1
+        if owners[0] < 0:
+            owner = owners[0] = self._new_vertex(strand)
+        counts[0] += 1
+
+        depth = len(strand) if self.max_depth is None else min(len(strand), self.max_depth)
+        node = 0
+        for i in range(depth):
+            slot = 4 * node + strand[i]
+            next_node = children[slot]
+            if not next_node:
+                if owner < 0:
+                    owner = self._new_vertex(strand)
+                for j in range(i, depth):
+                    next_node = len(counts)
+                    children[4 * node + strand[j]] = next_node
+                    children.extend((0, 0, 0, 0))
+                    counts.append(1)
+                    owners.append(owner)
+                    node = next_node
+                break
+            node = next_node
+            counts[node] += 1
+
+        if depth < len(strand):
+            bucket = self.buckets.setdefault(node, [])
+            if owner < 0:
+                if any(self.vertices[member].sequence.startswith(strand) for member in bucket):
+                    return None
+                owner = self._new_vertex(strand)
+            bucket.append(owner)
+        return self.vertices[owner] if owner >= 0 else None
+
+    def _tail_mismatches(self, node: int, strand: bytes, start: int, allow_mis_matches: int) -> Iterator[tuple[int, int]]:
+        """
+        Yields (mismatches, vertex index) for the strands in the bucket of a depth-capped leaf whose tail matches
+        strand[start:] within the mismatch budget, in insertion order. The packed tails are kept for later queries.
+        """
+        length = len(strand) - start
+        tail = pack_strand(strand[start:])
+        for member in self.buckets.get(node, ()):
+            sequence = self.vertices[member].sequence
+            if len(sequence) < self.max_depth + length:
+                continue
+            if member not in self.packed_tails:
+                self.packed_tails[member] = pack_strand(sequence[self.max_depth:])
+            mismatches = packed_mismatches(tail, self.packed_tails[member], length)
+            if mismatches <= allow_mis_matches:
+                yield mismatches, member
+
+    def build_failure_links(self) -> None:
+        """
+        Adds Aho-Corasick failure links to the trie, stored in the fail array next to the node depths.
+        Must be rebuilt after insertions.
+        """
+        children = self.children
+        fail = self.fail = array("i", bytes(4 * len(self)))
+        depths = self.depths = array("i", bytes(4 * len(self)))
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            for code in range(4):
+                child = children[4 * node + code]
+                if not child:
+                    continue
+                depths[child] = depths[node] + 1
+                if node:
+                    target = fail[node]
+                    while target and not children[4 * target + code]:
+                        target = fail[target]
+                    fail[child] = children[4 * target + code]
+                queue.append(child)
+
+    def suffix_matches(self, strand: bytes) -> Iterator[tuple[int, Vertex]]:
+        """
+        Same as TrieNode.suffix_matches, over the base codes of the strand.
+        """
+        children, fail = self.children, self.fail
+        node = 0
+        for code in strand:
+            while node and not children[4 * node + code]:
+                node = fail[node]
+            node = children[4 * node + code]
+        while node:
+            yield self.depths[node], self.vertices[self.owners[node]]
+            node = fail[node]
+
+    def best_first_search(self, strand: bytes, allow_mis_matches: int = 0, start: int = 0) -> Vertex | None:
+        """
+        Same as TrieNode.best_first_search, over the base codes of the strand, stopping at max_depth.
+        """
+        children = self.children
+        capped_at = len(strand) if self.max_depth is None else start + self.max_depth
+        buckets = [[(0, start)]] + [[] for _ in range(allow_mis_matches)]
+        tail_matches: list[int | None] = [None] * (allow_mis_matches + 1)
+        for mismatches, stack in enumerate(buckets):
+            while stack:
+                node, i = stack.pop()
+                while True:
+                    if i == len(strand):
+                        owner = self.owners[node]
+                        return self.vertices[owner] if owner >= 0 else None
+                    if i == capped_at:
+                        budget = allow_mis_matches - mismatches
+                        for tail_mismatches, member in self._tail_mismatches(node, strand, i, budget):
+                            if tail_matches[mismatches + tail_mismatches] is None:
+                                tail_matches[mismatches + tail_mismatches] = member
+                        break
+                    code = strand[i]
+                    i += 1
+                    if mismatches < allow_mis_matches:
+                        for other in range(4):
+                            child = children[4 * node + other]
+                            if other != code and child:
+                                buckets[mismatches + 1].append((child, i))
+                    node = children[4 * node + code]
+                    if not node:
+                        break
+            if tail_matches[mismatches] is not None:
+                return self.vertices[tail_matches[mismatches]]
+        return None
+
+    def search(self, strand: bytes, allow_mis_matches: int = 0, node: int = 0, depth: int = 0) -> Vertex | None:
+        """
+        Searches for a strand in the trie starting at the given node and depth, allowing for a specified number of
+        mismatches. In a depth-capped trie, the part of the strand past max_depth is verified against the read store.
+        """
+        children = self.children
+        for i, code in enumerate(strand):
+            if depth == self.max_depth:
+                for _, member in self._tail_mismatches(node, strand, i, allow_mis_matches):
+                    return self.vertices[member]
+                return None
+            next_node = children[4 * node + code]
+            if not next_node:
+                if not allow_mis_matches:
+                    return None
+                for code in _CODES:
+                    extra = self.search(code + strand[i+1:], allow_mis_matches - 1, node, depth)
+                    if extra is not None:
+                        return extra
+                return None
+            node = next_node
+            depth += 1
+        owner = self.owners[node]
+        return self.vertices[owner] if owner >= 0 else None
+
+
+class RadixTrie:
+    """
+    Path-compressed (radix) prefix trie with the same semantics as TrieNode, stored in flat integer arrays.
+
+    Unary chains are collapsed into a single node whose incoming edge is the span
+    reads[read_ids[n]][starts[n]: starts[n] + lengths[n]] of the read store. Every position along an edge belongs to
+    the same read, so read_ids[n] is also the index of the owning Vertex. Strands are given as base codes
+    (see encode_strand).
+    """
+    encoded = True
+
     def __init__(self) -> None:
         """
-        Initializes an empty Graph.
+        Initializes a RadixTrie holding only the root node.
         """
-        self.vertices: dict[Vertex, None] = {}
+        self.children: array = array("i", [0, 0, 0, 0])
+        self.counts: array = array("I", [0])
+        self.read_ids: array = array("i", [-1])
+        self.starts: array = array("i", [0])
+        self.lengths: array = array("i", [0])
+        self.reads: list[bytes] = []
+        self.vertices: list[Vertex] = []
 
-    def load_from_strands(self, strands: list[str], allow_mis_matches: int) -> None:
+    def __len__(self) -> int:
         """
-        Constructs the overlap graph from a list of DNA strands using a trie for efficient matching.
+        Returns the number of nodes in the trie.
         """
-        trie = TrieNode()
-        
-        for strand in strands:
-            vertex = trie.insert_strand(strand)
-            if vertex is not None:
-                vertex.sequence = strand
-                self.vertices[vertex] = None
-        
-        for vertex in self.vertices.keys():
-            for i in range(1, len(vertex.sequence) - 2 * int(math.log(len(strands), 4))):
-                suffix_strand = vertex.sequence[i:]
-                match = trie.search(suffix_strand, allow_mis_matches)
-                if match and match != vertex:
-                    vertex.connected_vertices.append((match, len(vertex.sequence) - i))
+        return len(self.counts)
+
+    def _new_vertex(self, strand: bytes) -> int:
+        """
+        Creates a Vertex for the strand, adds the strand to the read store and returns its read id.
+        """
+        self.reads.append(strand)
+        self.vertices.append(Vertex(strand))
+        return len(self.vertices) - 1
+
+    def _add_node(self, parent: int, read_id: int, start: int, length: int, strand_count: int) -> int:
+        """
+        Adds a child to the parent node whose edge spans the given part of the read store.
+        """
+        node = len(self.counts)
+        self.children[4 * parent + self.reads[read_id][start]] = node
+        self.children.extend((0, 0, 0, 0))
+        self.counts.append(strand_count)
+        self.read_ids.append(read_id)
+        self.starts.append(start)
+        self.lengths.append(length)
+        return node
+
+    def _split(self, node: int, depth: int) -> None:
+        """
+        Splits the edge of the node after depth characters. The node keeps the upper part of the edge, so the
+        pointer from its parent stays valid, and a new child takes over the lower part and the old children.
+        """
+        children = self.children
+        old_children = children[4 * node: 4 * node + 4]
+        children[4 * node: 4 * node + 4] = array("i", [0, 0, 0, 0])
+        lower = self._add_node(node, self.read_ids[node], self.starts[node] + depth, self.lengths[node] - depth,
+                               self.counts[node] - 1)
+        children[4 * lower: 4 * lower + 4] = old_children
+        self.lengths[node] = depth
+
+    def insert_strand(self, strand: bytes) -> Vertex | None:
+        """
+        Inserts a strand into the trie, returning its new Vertex only if the strand is not a prefix of an
+        earlier strand. Edges are split where the strand diverges from or ends inside them.
+        """
+        children, counts, read_ids, starts, lengths, reads = (self.children, self.counts, self.read_ids, self.starts,
+                                                              self.lengths, self.reads)
+        owner = -1
+        if read_ids[0] < 0:
+            owner = read_ids[0] = self._new_vertex(strand)
+        counts[0] += 1
+
+        node, depth, i = 0, 0, 0
+        while i < len(strand):
+            if depth == lengths[node]:
+                child = children[4 * node + strand[i]]
+                if not child:
                     break
+                node, depth = child, 1
+                counts[node] += 1
+            elif reads[read_ids[node]][starts[node] + depth] == strand[i]:
+                depth += 1
+            else:
+                break
+            i += 1
 
-    def get_sequenced_result(self, min_overlap: int = 0, in_coming_links_min: int = 0) -> str:
+        if depth < lengths[node]:
+            self._split(node, depth)
+        if i == len(strand):
+            return self.vertices[owner] if owner >= 0 else None
+        if owner < 0:
+            owner = self._new_vertex(strand)
+        self._add_node(node, owner, i, len(strand) - i, 1)
+        return self.vertices[owner]
+
+    def best_first_search(self, strand: bytes, allow_mis_matches: int = 0, start: int = 0) -> Vertex | None:
         """
-        Traverses the overlap graph to generate the assembled genome sequence.
+        Same as TrieNode.best_first_search, over the base codes of the strand, with stacks of (node, depth, index)
+        positions.
         """
-        incoming_links_values = {v: 0 for v in self.vertices.keys()}
-        
-        for vertex in self.vertices.keys():
-            for edge_end, match_length in vertex.connected_vertices:
-                incoming_links_values[edge_end] += match_length
+        children, read_ids, starts, lengths, reads = self.children, self.read_ids, self.starts, self.lengths, self.reads
+        buckets = [[(0, 0, start)]] + [[] for _ in range(allow_mis_matches)]
+        for mismatches, stack in enumerate(buckets):
+            while stack:
+                node, depth, i = stack.pop()
+                while True:
+                    if i == len(strand):
+                        owner = read_ids[node]
+                        return self.vertices[owner] if owner >= 0 else None
+                    code = strand[i]
+                    i += 1
+                    if depth < lengths[node]:
+                        edge_code = reads[read_ids[node]][starts[node] + depth]
+                        depth += 1
+                        if edge_code == code:
+                            continue
+                        if mismatches < allow_mis_matches:
+                            buckets[mismatches + 1].append((node, depth, i))
+                        break
+                    if mismatches < allow_mis_matches:
+                        for other in range(4):
+                            child = children[4 * node + other]
+                            if other != code and child:
+                                buckets[mismatches + 1].append((child, 1, i))
+                    node, depth = children[4 * node + code], 1
+                    if not node:
+                        break
+        return None
 
-        max_seq = ""
+    def search(self, strand: bytes, allow_mis_matches: int = 0, node: int = 0, depth: int = 0) -> Vertex | None:
+        """
+        Searches for a strand in the trie starting depth characters into the edge of the given node, allowing for a
+        specified number of mismatches.
+        """
+        children, read_ids, starts, lengths, reads = self.children, self.read_ids, self.starts, self.lengths, self.reads
+        for i, code in enumerate(strand):
+            if depth < lengths[node]:
+                if reads[read_ids[node]][starts[node] + depth] == code:
+                    depth += 1
+                    continue
+            else:
+                next_node = children[4 * node + code]
+                if next_node:
+                    node, depth = next_node, 1
+                    continue
+            if not allow_mis_matches:
+                return None
+            for code in _CODES:
+                extra = self.search(code + strand[i+1:], allow_mis_matches - 1, node, depth)
+                if extra is not None:
+                    return extra
+            return None
+        owner = read_ids[node]
+        return self.vertices[owner] if owner >= 0 else None
 
-        for origin, sum_incoming_links in incoming_links_values.items():
-            if sum_incoming_links > in_coming_links_min:
+
+TRIE_BACKENDS = {"object": TrieNode, "array": ArrayTrie, "radix": RadixTrie}
+
+
+class OverlapEngine:
+    """
+    Interface of the engines finding suffix-prefix overlaps between reads, registered in OVERLAP_ENGINES.
+    trie_edges_up_to is the largest allowance for which an engine finds the same edges as the trie engine, None for
+    every allowance.
+    """
+    encoded = True
+    available = True
+    max_mis_matches: int | None = None
+    supports_edits = False
+    takes_seed_length = False
+    trie_edges_up_to: int | None = 0
+    bytes_per_read = 0
+    bytes_per_base = 0
+    microseconds_per_read = 0.0
+    microseconds_per_doubling = 0.0
+    mismatch_slowdown = 1.0
+
+    vertices: list[Vertex]
+
+    @classmethod
+    def build(cls, strands: list[str], **options) -> 'OverlapEngine':
+        """
+        Builds the engine over a list of DNA strands, encoding them first for engines working on base codes. Engines
+        with supports_edits accept a max_edits option, and those with takes_seed_length a seed_length option.
+        """
+        if cls.encoded:
+            strands = [encode_strand(strand) for strand in strands]
+        return cls(strands, **options)
+
+    @classmethod
+    def memory_estimate(cls, num_strands: int, read_length: int, allow_mis_matches: int = 0) -> int:
+        """
+        Returns the approximate peak memory in bytes of building the engine over num_strands reads of read_length
+        bases, from bytes_per_read and bytes_per_base.
+        """
+        return num_strands * (cls.bytes_per_read + cls.bytes_per_base * read_length)
+
+    @classmethod
+    def time_estimate(cls, num_strands: int, read_length: int, allow_mis_matches: int = 0) -> float:
+        """
+        Returns the approximate seconds of building the engine over num_strands reads of read_length bases and
+        finding the longest overlap of each, from microseconds_per_read on 1000 reads of 100 bases,
+        microseconds_per_doubling and mismatch_slowdown.
+        """
+        per_read = cls.microseconds_per_read + cls.microseconds_per_doubling * max(0.0, math.log2(num_strands / 1000))
+        return num_strands * per_read * read_length / 100 * cls.mismatch_slowdown ** allow_mis_matches / 1e6
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields, longest first, the vertices whose prefix matches a suffix of the given vertex within
+        allow_mis_matches mismatches together with the overlap length, ignoring overlaps of at most short_overlap
+        bases. Engines finding several partners for a suffix yield the one needing the fewest mismatches, then the
+        earliest.
+        """
+        raise NotImplementedError
+
+    def longest_overlap(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> tuple[Vertex, int] | None:
+        """
+        Returns the first edge yielded by iter_overlaps, or None if the vertex has no overlap.
+        """
+        return next(self.iter_overlaps(vertex, allow_mis_matches, short_overlap), None)
+
+    def all_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> list[tuple[Vertex, int]]:
+        """
+        Returns every edge yielded by iter_overlaps.
+        """
+        return list(self.iter_overlaps(vertex, allow_mis_matches, short_overlap))
+
+    def add_strands(self, strands: list[str]) -> list[Vertex]:
+        """
+        Adds DNA strands to the built engine, returning the new vertices. Engines whose index cannot grow raise
+        ValueError.
+        """
+        raise ValueError(f"{type(self).__name__} cannot add strands once built")
+
+
+def _select_vertices(strands: list[bytes]) -> list[int]:
+    """
+    Returns the indices of the strands that become vertices, in order: those that are neither equal to nor a prefix
+    of an earlier strand, exactly as inserting them into a trie would decide. The strands that extend a strand are
+    contiguous right after it in sorted order, so a backward pass with a stack of such blocks settles all of them.
+    """
+    order = sorted(range(len(strands)), key=strands.__getitem__)
+    selected = bytearray(len(strands))
+    blocks: list[tuple[bytes, int]] = []
+    for position in range(len(order) - 1, -1, -1):
+        index = order[position]
+        strand = strands[index]
+        first_extension = len(strands)
+        while blocks and blocks[-1][0].startswith(strand):
+            first_extension = min(first_extension, blocks.pop()[1])
+        blocks.append((strand, min(first_extension, index)))
+        repeated = position > 0 and strands[order[position - 1]] == strand
+        selected[index] = not repeated and first_extension > index
+    return [index for index in range(len(strands)) if selected[index]]
+
+
+def _concatenate(strands: list[bytes]) -> tuple[array, array]:
+    """
+    Concatenates encoded strands into one integer text, ending each with its own sentinel symbol (4 + its index).
+    Returns the text and the start position of every strand in it.
+    """
+    text = array("i")
+    starts = array("i")
+    for index, strand in enumerate(strands):
+        starts.append(len(text))
+        text.extend(strand)
+        text.append(4 + index)
+    return text, starts
+
+
+def _suffix_array(text: array) -> array:
+    """
+    Builds the suffix array of an integer text by prefix doubling: suffixes are ranked by their first k symbols,
+    then re-sorted by pairs of ranks for their first 2k symbols, until all ranks are distinct.
+    """
+    n = len(text)
+    suffixes = sorted(range(n), key=text.__getitem__)
+    rank = array("i", bytes(4 * n))
+    for position in range(1, n):
+        rank[suffixes[position]] = rank[suffixes[position - 1]] + (text[suffixes[position]] != text[suffixes[position - 1]])
+    k = 1
+    while n and rank[suffixes[-1]] < n - 1:
+        keys = array("q", map((n + 1).__mul__, rank))
+        for suffix in range(n - k):
+            keys[suffix] += rank[suffix + k] + 1
+        suffixes.sort(key=keys.__getitem__)
+        previous, current = -1, -1
+        for suffix in suffixes:
+            if keys[suffix] != previous:
+                previous = keys[suffix]
+                current += 1
+            rank[suffix] = current
+        k *= 2
+    return array("i", suffixes)
+
+
+def _lcp_array(text: array, suffixes: array) -> array:
+    """
+    Builds the LCP array of a suffix array with Kasai's algorithm: lcp[r] is the length of the longest common
+    prefix of the suffixes ranked r - 1 and r.
+    """
+    n = len(text)
+    rank = array("i", bytes(4 * n))
+    for position, suffix in enumerate(suffixes):
+        rank[suffix] = position
+    lcp = array("i", bytes(4 * n))
+    common = 0
+    for suffix in range(n):
+        position = rank[suffix]
+        if not position:
+            common = 0
+            continue
+        previous = suffixes[position - 1]
+        while suffix + common < n and previous + common < n and text[suffix + common] == text[previous + common]:
+            common += 1
+        lcp[position] = common
+        if common:
+            common -= 1
+    return lcp
+
+
+def _vectorized_suffix_lcp(text: array) -> tuple[array, array]:
+    """
+    Builds the same suffix and LCP arrays as _suffix_array and _lcp_array with NumPy. The suffix array comes from
+    prefix doubling with one lexsort per doubling, keeping the ranks of every round: two suffixes share their first
+    k symbols exactly when they have the same rank in round k. The LCP of neighbouring suffixes is then summed from
+    the longest round down, adding k wherever the ranks k symbols further on still agree.
+    """
+    n = len(text)
+    symbols = np.frombuffer(text, dtype=np.int32) if n else np.zeros(0, dtype=np.int32)
+    suffixes = np.argsort(symbols, kind="stable").astype(np.int32)
+    rank = np.zeros(n, dtype=np.int32)
+    rank[suffixes[1:]] = np.cumsum(symbols[suffixes[1:]] != symbols[suffixes[:-1]], dtype=np.int32)
+    # The symbols themselves tell apart suffixes differing in their first symbol.
+    ranks = [symbols]
+    while n and rank[suffixes[-1]] < n - 1:
+        k = 1 << (len(ranks) - 1)
+        second = np.full(n, -1, dtype=np.int32)
+        second[:n - k] = rank[k:]
+        suffixes = np.lexsort((second, rank)).astype(np.int32)
+        changes = (rank[suffixes[1:]] != rank[suffixes[:-1]]) | (second[suffixes[1:]] != second[suffixes[:-1]])
+        del second
+        rank = np.zeros(n, dtype=np.int32)
+        rank[suffixes[1:]] = np.cumsum(changes, dtype=np.int32)
+        del changes
+        ranks.append(rank)
+
+    lcp = np.zeros(n, dtype=np.int32)
+    common = lcp[1:]
+    first, second = np.empty(n - 1 if n else 0, dtype=np.int32), np.empty(n - 1 if n else 0, dtype=np.int32)
+    for level in reversed(range(len(ranks))):
+        np.add(suffixes[:-1], common, out=first)
+        np.add(suffixes[1:], common, out=second)
+        agree = np.maximum(first, second) < n
+        np.minimum(first, n - 1, out=first)
+        np.minimum(second, n - 1, out=second)
+        agree &= ranks[level][first] == ranks[level][second]
+        common += agree.astype(np.int32) << level
+    suffix_array, lcp_array = array("i"), array("i")
+    suffix_array.frombytes(suffixes.tobytes())
+    lcp_array.frombytes(lcp.tobytes())
+    return suffix_array, lcp_array
+
+
+class SuffixArrayOverlaps(OverlapEngine):
+    """
+    Exact suffix-prefix overlap engine built on a suffix array and LCP array of all reads concatenated, each
+    followed by its own sentinel symbol (4 + read index).
+
+    A single scan over the suffix array keeps a stack of the read starts seen so far, grouped by their longest
+    common prefix with the current suffix. When the scan reaches the suffix at offset i of read r, the entries
+    sharing all of r[i:] are the reads having r[i:] as a prefix. The smallest such read index is recorded for that
+    text position, which is the vertex a trie search for r[i:] would return. Only that column, one integer per
+    base, is kept after construction. With NumPy, the suffix and LCP arrays are built by _vectorized_suffix_lcp.
+    """
+    encoded = True
+    max_mis_matches = 0
+    bytes_per_read = 550 if np is None else 0
+    bytes_per_base = 97 if np is None else 75
+    microseconds_per_read = 550 if np is None else 200
+    microseconds_per_doubling = 65 if np is None else 18
+
+    def __init__(self, strands: list[bytes]) -> None:
+        """
+        Builds the engine over a list of encoded strands.
+        """
+        vertex_ids = _select_vertices(strands)
+        self.vertices: list[Vertex] = [Vertex(strands[index]) for index in vertex_ids]
+        self.read_vertices: dict[int, Vertex] = dict(zip(vertex_ids, self.vertices))
+        self.starts: dict[Vertex, int] = {}
+
+        text, starts = _concatenate(strands)
+        for index, vertex in self.read_vertices.items():
+            self.starts[vertex] = starts[index]
+
+        if np is None:
+            suffixes = _suffix_array(text)
+            lcp = _lcp_array(text, suffixes)
+        else:
+            suffixes, lcp = _vectorized_suffix_lcp(text)
+        self.matches: array = self._first_prefix_matches(strands, text, starts, suffixes, lcp)
+
+    @staticmethod
+    def _first_prefix_matches(strands: list[bytes], text: array, starts: array, suffixes: array,
+                              lcp: array) -> array:
+        """
+        Returns, for every text position inside a read, the smallest index of a read whose prefix is the rest of that
+        read from this position on, or -1 if there is none.
+        """
+        matches = array("i", [-1]) * len(text)
+        lengths = {len(strand) for strand in strands}
+        first_reads: dict[bytes, int] = {}
+        if len(lengths) > 1:
+            for index, strand in enumerate(strands):
+                first_reads.setdefault(strand, index)
+
+        stack: list[list[int]] = []
+        for position, suffix in enumerate(suffixes):
+            common = lcp[position]
+            merged = len(strands)
+            while stack and stack[-1][0] > common:
+                merged = min(merged, stack.pop()[1])
+            if merged < len(strands):
+                if stack and stack[-1][0] == common:
+                    stack[-1][1] = min(stack[-1][1], merged)
+                else:
+                    stack.append([common, merged])
+
+            symbol = text[suffix]
+            if symbol >= 4:
                 continue
-                
-            current = origin
-            sequence = current.sequence
-            i = 0
-            while current.connected_vertices and i < len(self.vertices):
-                next_vertex, overlap_size = current.connected_vertices[0]
-                if overlap_size < min_overlap:
+            read = bisect_right(starts, suffix) - 1
+            offset = suffix - starts[read]
+            length = len(strands[read]) - offset
+            if not offset:
+                if stack and stack[-1][0] == length:
+                    stack[-1][1] = min(stack[-1][1], read)
+                else:
+                    stack.append([length, read])
+                continue
+            best = len(strands)
+            for depth, first in reversed(stack):
+                if depth < length:
                     break
-                
-                sequence += next_vertex.sequence[overlap_size:]
-                current = next_vertex
-                i += 1
-            
+                best = min(best, first)
+            if length in lengths and first_reads:
+                best = min(best, first_reads.get(strands[read][offset:], best))
+            if best < len(strands):
+                matches[suffix] = best
+        return matches
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields, longest first, the earliest vertex whose prefix equals each suffix of the given vertex together with
+        the overlap length, ignoring overlaps of at most short_overlap bases.
+        """
+        start, length = self.starts[vertex], len(vertex.sequence)
+        for i in range(1, length - short_overlap):
+            match = self.matches[start + i]
+            if match >= 0 and self.read_vertices[match] != vertex:
+                yield self.read_vertices[match], length - i
+
+
+def _suffix_array_bwt(strands: list[bytes]) -> tuple[bytes, array, array]:
+    """
+    Builds the BWT of encoded strands concatenated by _concatenate from their suffix array, writing sentinels as
+    4. Returns the BWT, the positions of its sentinels and the strand starting right after each of them.
+    """
+    text, starts = _concatenate(strands)
+    bwt = bytearray(len(text))
+    positions, reads = array("i"), array("i")
+    for position, suffix in enumerate(_suffix_array(text)):
+        symbol = text[suffix - 1]
+        if symbol >= 4:
+            bwt[position] = 4
+            positions.append(position)
+            reads.append(bisect_right(starts, suffix) - 1)
+        else:
+            bwt[position] = symbol
+    return bytes(bwt), positions, reads
+
+
+def _collection_bwt(strands: list[bytes]) -> tuple[bytes, array, array]:
+    """
+    Builds the same BWT as _suffix_array_bwt with NumPy, without a suffix array, column by column from the ends of
+    the strands as in the BCR algorithm of Bauer, Cox and Rosone. Step j inserts the suffix of j bases of every
+    strand at least that long. It goes at row C[c] + rank of c before the row of the strand's suffix one base
+    shorter, where c is the BWT symbol of that row. Only the BWT, the strands as a matrix of codes and a few arrays
+    per strand are held, about 5 bytes per base at the peak.
+    """
+    num_strands = len(strands)
+    lengths = np.array([len(strand) for strand in strands], dtype=np.int64)
+    width = int(lengths.max()) if num_strands else 0
+    columns = np.full((num_strands, width + 1), 4, dtype=np.uint8)
+    for row, strand in enumerate(strands):
+        columns[row, width - len(strand): width] = np.frombuffer(strand, dtype=np.uint8)
+
+    bwt = columns[:, width - 1].copy() if width else np.full(num_strands, 4, dtype=np.uint8)
+    totals = np.bincount(bwt, minlength=5)
+    rows = np.arange(num_strands)
+    finished_reads = np.flatnonzero(lengths == 0)
+    finished_rows = finished_reads.copy()
+    for step in range(1, width + 1):
+        active = np.flatnonzero(lengths >= step)
+        symbols = bwt[rows[active]]
+        first = np.concatenate(([0], np.cumsum(totals[:3])))
+        targets = first[symbols]
+        for code in range(4):
+            chosen = symbols == code
+            if chosen.any():
+                targets[chosen] += np.searchsorted(np.flatnonzero(bwt == code), rows[active[chosen]])
+        order = np.argsort(targets)
+        targets, active = targets[order], active[order]
+        insert_at = targets - np.arange(len(targets))
+        inserted = columns[active, width - 1 - step]
+        totals += np.bincount(inserted, minlength=5)
+        bwt = np.insert(bwt, insert_at, inserted)
+        finished_rows += np.searchsorted(insert_at, finished_rows, side="right")
+        rows[active] = targets
+        done = lengths[active] == step
+        finished_rows = np.concatenate((finished_rows, targets[done]))
+        finished_reads = np.concatenate((finished_reads, active[done]))
+
+    order = np.argsort(finished_rows)
+    return bwt.tobytes(), array("i", finished_rows[order].tolist()), array("i", finished_reads[order].tolist())
+
+
+_SENTINEL_AS_A = bytes.maketrans(b"\x04", b"\x00")
+_FM_BLOCK = 256
+_FM_LOW_BITS = int("01" * _FM_BLOCK, 2)
+_FM_REPEATS = tuple(code * _FM_LOW_BITS for code in range(4))
+
+
+class FMIndexOverlaps(OverlapEngine):
+    """
+    Suffix-prefix overlap engine on an FM-index of all reads concatenated, each followed by its own sentinel.
+
+    The BWT is packed at 2 bits per symbol, with sentinels stored as A and their BWT positions kept aside. Occurrence
+    counts are sampled every _FM_BLOCK symbols and completed with a popcount over the packed block. A backward
+    search over a read, from its last base, visits the BWT range of each of its suffixes. Sentinels inside a range
+    mark reads whose prefix is that suffix. With mismatches the backward search backtracks over substitutions, up
+    to allow_mis_matches of them. The BWT is built by _collection_bwt with NumPy, and from a suffix array without it.
+    """
+    encoded = True
+    max_mis_matches = None
+    bytes_per_read = 500 if np is None else 270
+    bytes_per_base = 97 if np is None else 7
+    microseconds_per_read = 410
+    microseconds_per_doubling = 0
+    mismatch_slowdown = 4.5
+
+    def __init__(self, strands: list[bytes]) -> None:
+        """
+        Builds the FM-index over a list of encoded strands.
+        """
+        vertex_ids = _select_vertices(strands)
+        self.vertices: list[Vertex] = [Vertex(strands[index]) for index in vertex_ids]
+        self.read_vertices: dict[int, Vertex] = dict(zip(vertex_ids, self.vertices))
+
+        bwt, self.dollar_positions, self.dollar_reads = (_suffix_array_bwt if np is None else _collection_bwt)(strands)
+        self.size: int = len(bwt)
+        self.packed: bytes = pack_strand(bwt.translate(_SENTINEL_AS_A)).to_bytes((self.size + 3) // 4, "little")
+
+        self.samples: array = array("I", bytes(16 * (self.size // _FM_BLOCK + 2)))
+        totals = [0, 0, 0, 0]
+        for block in range(self.size // _FM_BLOCK + 1):
+            for code in range(4):
+                length = min(_FM_BLOCK, self.size - block * _FM_BLOCK)
+                self.samples[4 * (block + 1) + code] = totals[code] = totals[code] + self._block_count(block, code, length)
+        self.first: list[int] = [0, 0, 0, 0]
+        for code in range(1, 4):
+            self.first[code] = self.first[code - 1] + self._occurrences(code - 1, self.size)
+
+    def _block_count(self, block: int, code: int, length: int) -> int:
+        """
+        Counts the code among the first length symbols of a packed BWT block, sentinels counting as A.
+        """
+        start = block * _FM_BLOCK // 4
+        word = int.from_bytes(self.packed[start: start + (length + 3) // 4], "little")
+        differs = word ^ _FM_REPEATS[code]
+        differs = (differs | differs >> 1) & _FM_LOW_BITS & ((1 << 2 * length) - 1)
+        return length - differs.bit_count()
+
+    def _occurrences(self, code: int, position: int) -> int:
+        """
+        Counts the base code in BWT[:position].
+        """
+        block, offset = divmod(position, _FM_BLOCK)
+        occurrences = self.samples[4 * block + code] + self._block_count(block, code, offset)
+        if code == 0:
+            occurrences -= bisect_left(self.dollar_positions, position)
+        return occurrences
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields the overlaps of OverlapEngine.iter_overlaps, found by backward searches over the vertex.
+        """
+        sequence, length = vertex.sequence, len(vertex.sequence)
+        hits: dict[int, list[tuple[int, int, int]]] = {}
+        stack = [(length - 1, 0, self.size, 0)]
+        while stack:
+            i, low, high, mismatches = stack.pop()
+            overlap = length - 1 - i
+            if short_overlap < overlap < length:
+                dollars_low = bisect_left(self.dollar_positions, low)
+                dollars_high = bisect_left(self.dollar_positions, high)
+                if dollars_low < dollars_high:
+                    hits.setdefault(overlap, []).append((mismatches, dollars_low, dollars_high))
+            if i < 0:
+                continue
+            for code in range(4):
+                cost = mismatches + (code != sequence[i])
+                if cost > allow_mis_matches:
+                    continue
+                next_low = self.first[code] + self._occurrences(code, low)
+                next_high = self.first[code] + self._occurrences(code, high)
+                if next_low < next_high:
+                    stack.append((i - 1, next_low, next_high, cost))
+
+        for overlap in sorted(hits, reverse=True):
+            _, read = min((mismatches, min(self.dollar_reads[low: high])) for mismatches, low, high in hits[overlap])
+            if self.read_vertices[read] != vertex:
+                yield self.read_vertices[read], overlap
+
+
+class KmerSeedOverlaps(OverlapEngine):
+    """
+    Suffix-prefix overlap engine hashing the first seed_length bases of every vertex.
+    The k-mer starting each suffix of a read looks up the candidate partners, and each one is then verified over the
+    whole overlap by counting mismatches on the packed reads, or by prefix_edit_distance when max_edits is set.
+    Errors are only found outside the seed, so this engine trades the completeness of the trie search for one
+    dictionary lookup per offset.
+    """
+    encoded = True
+    max_mis_matches = None
+    supports_edits = True
+    takes_seed_length = True
+    bytes_per_read = 500
+    bytes_per_base = 2
+    microseconds_per_read = 22
+    microseconds_per_doubling = 8
+
+    def __init__(self, strands: list[bytes], seed_length: int | None = None, max_edits: int | None = None) -> None:
+        """
+        Indexes the vertices of a list of encoded strands by their prefix k-mer. seed_length defaults to one more
+        than the shortest overlap ignored by the graph. With max_edits, overlaps are accepted within that many
+        substitutions, insertions and deletions instead of allow_mis_matches substitutions.
+        """
+        self.vertices: list[Vertex] = [Vertex(strands[index]) for index in _select_vertices(strands)]
+        self.seed_length: int = seed_length or 2 * int(math.log(len(strands), 4)) + 1
+        self.max_edits: int | None = max_edits
+        self.masks: dict[Vertex, tuple[int, ...]] = {}
+        self.packed: dict[Vertex, int] = {vertex: pack_strand(vertex.sequence) for vertex in self.vertices}
+        self.seeds: dict[bytes, list[Vertex]] = {}
+        for vertex in self.vertices:
+            if len(vertex.sequence) >= self.seed_length:
+                self.seeds.setdefault(vertex.sequence[:self.seed_length], []).append(vertex)
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields the overlaps of OverlapEngine.iter_overlaps whose first seed_length bases match exactly, or within
+        max_edits edits when it is set.
+        """
+        if self.max_edits is not None:
+            yield from self._iter_edit_overlaps(vertex, short_overlap)
+            return
+        sequence, length, seed_length = vertex.sequence, len(vertex.sequence), self.seed_length
+        packed = self.packed[vertex]
+        for i in range(1, length - max(short_overlap, seed_length - 1)):
+            overlap = length - i
+            suffix = packed >> 2 * i
+            best, best_mismatches = None, allow_mis_matches + 1
+            for candidate in self.seeds.get(sequence[i: i + seed_length], ()):
+                if len(candidate.sequence) < overlap:
+                    continue
+                mismatches = packed_mismatches(suffix, self.packed[candidate], overlap)
+                if mismatches < best_mismatches:
+                    best, best_mismatches = candidate, mismatches
+                    if mismatches == 0:
+                        break
+            if best is not None and best is not vertex:
+                yield best, overlap
+
+    def _iter_edit_overlaps(self, vertex: Vertex, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields, by decreasing suffix length, the vertices whose prefix aligns with a suffix of the given vertex
+        within max_edits edits after an exact seed, together with the length of that prefix, ignoring suffixes of
+        at most short_overlap bases. For each suffix, the partner with the fewest edits, then the earliest, is
+        chosen. Partners matching without any mismatch skip the alignment.
+        """
+        sequence, length, seed_length, max_edits = vertex.sequence, len(vertex.sequence), self.seed_length, self.max_edits
+        packed = self.packed[vertex]
+        for i in range(1, length - max(short_overlap, seed_length - 1)):
+            suffix_length = length - i
+            suffix = sequence[i:]
+            best, best_edits, best_overlap = None, max_edits + 1, 0
+            for candidate in self.seeds.get(sequence[i: i + seed_length], ()):
+                other = candidate.sequence
+                if len(other) >= suffix_length and not packed_mismatches(packed >> 2 * i, self.packed[candidate], suffix_length):
+                    edits, overlap = 0, suffix_length
+                else:
+                    if candidate not in self.masks:
+                        self.masks[candidate] = pattern_masks(other)
+                    pattern_length = min(len(other), suffix_length + max_edits)
+                    edits, overlap = prefix_edit_distance(self.masks[candidate], pattern_length, suffix, max_edits)
+                if edits < best_edits:
+                    best, best_edits, best_overlap = candidate, edits, overlap
+                    if not edits:
+                        break
+            if best is not None and best is not vertex:
+                yield best, best_overlap
+
+
+class PigeonholeOverlaps(OverlapEngine):
+    """
+    Suffix-prefix overlap engine relying on the pigeonhole principle: an overlap with at most k mismatches, cut into
+    k + 1 pieces, matches at least one piece exactly.
+    For every mismatch budget it indexes the first k + 1 pieces of every vertex prefix, at piece lengths doubling
+    from (short_overlap + 1) // (k + 1), so that longer overlaps are looked up with longer, more selective pieces.
+    Every partner within the budget is found by exact lookups alone and then verified over the whole packed overlap.
+    """
+    encoded = True
+    max_mis_matches = None
+    bytes_per_read = 1200
+    bytes_per_base = 11
+    microseconds_per_read = 55
+    microseconds_per_doubling = 0
+
+    def __init__(self, strands: list[bytes]) -> None:
+        """
+        Keeps the vertices of a list of encoded strands; the piece index of each mismatch budget is built on its
+        first query.
+        """
+        self.vertices: list[Vertex] = [Vertex(strands[index]) for index in _select_vertices(strands)]
+        self.vertex_ids: dict[Vertex, int] = {vertex: index for index, vertex in enumerate(self.vertices)}
+        self.packed: list[int] = [pack_strand(vertex.sequence) for vertex in self.vertices]
+        self.pieces: dict[int, tuple[list[int], dict[tuple[int, int, bytes], list[int]]]] = {}
+
+    def _piece_index(self, allow_mis_matches: int, short_overlap: int) -> tuple[list[int], dict[tuple[int, int, bytes], list[int]]]:
+        """
+        Returns the piece lengths and the piece index for a mismatch budget, mapping (piece length, piece number,
+        piece) to the ids of the vertices whose prefix holds that piece.
+        """
+        if allow_mis_matches not in self.pieces:
+            parts = allow_mis_matches + 1
+            longest = max((len(vertex.sequence) for vertex in self.vertices), default=0)
+            lengths = [max(1, (short_overlap + 1) // parts)]
+            while parts * lengths[-1] * 2 <= longest:
+                lengths.append(lengths[-1] * 2)
+            index: dict[tuple[int, int, bytes], list[int]] = {}
+            for vertex_id, vertex in enumerate(self.vertices):
+                sequence = vertex.sequence
+                for length in lengths:
+                    if parts * length > len(sequence):
+                        break
+                    for part in range(parts):
+                        index.setdefault((length, part, sequence[part * length: (part + 1) * length]), []).append(vertex_id)
+            self.pieces[allow_mis_matches] = lengths, index
+        return self.pieces[allow_mis_matches]
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields the overlaps of OverlapEngine.iter_overlaps, found by looking up the allow_mis_matches + 1 pieces of
+        each suffix.
+        """
+        lengths, index = self._piece_index(allow_mis_matches, short_overlap)
+        parts = allow_mis_matches + 1
+        sequence, self_id = vertex.sequence, self.vertex_ids[vertex]
+        packed = self.packed[self_id]
+        for i in range(1, len(sequence) - short_overlap):
+            suffix = sequence[i:]
+            overlap = len(suffix)
+            packed_suffix = packed >> 2 * i
+            length = lengths[bisect_right(lengths, overlap // parts) - 1] if overlap >= parts * lengths[0] else 0
+            if length:
+                candidates = set()
+                for part in range(parts):
+                    candidates.update(index.get((length, part, suffix[part * length: (part + 1) * length]), ()))
+            else:
+                candidates = range(len(self.vertices))
+            best, best_mismatches = None, allow_mis_matches + 1
+            for candidate in sorted(candidates):
+                if len(self.vertices[candidate].sequence) < overlap:
+                    continue
+                mismatches = packed_mismatches(packed_suffix, self.packed[candidate], overlap)
+                if mismatches < best_mismatches:
+                    best, best_mismatches = candidate, mismatches
+                    if mismatches == 0:
+                        break
+            if best is not None and best != self_id:
+                yield self.vertices[best], overlap
+
+
+_MINIMIZER_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def _minimizers(strand: bytes, kmer_length: int, window: int) -> list[tuple[int, int]]:
+    """
+    Returns the (hash, position) minimizers of an encoded strand: the k-mer with the smallest hash in every window of
+    consecutive k-mers, the rightmost one on ties, each listed once. A strand too short for a full window keeps
+    the minimizer of its k-mers.
+    """
+    mask = (1 << 2 * kmer_length) - 1
+    value = 0
+    queue: deque[tuple[int, int]] = deque()
+    minimizers: list[tuple[int, int]] = []
+    for i, code in enumerate(strand):
+        value = (value << 2 | code) & mask
+        position = i - kmer_length + 1
+        if position < 0:
+            continue
+        kmer_hash = value * _MINIMIZER_MULTIPLIER & mask
+        while queue and queue[-1][0] >= kmer_hash:
+            queue.pop()
+        queue.append((kmer_hash, position))
+        if queue[0][1] <= position - window:
+            queue.popleft()
+        if position >= window - 1 and (not minimizers or minimizers[-1] != queue[0]):
+            minimizers.append(queue[0])
+    if not minimizers and queue:
+        minimizers.append(queue[0])
+    return minimizers
+
+
+def _colinear_chain(hits: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """
+    Returns the longest chain of (position, other position) hits increasing in both positions.
+    """
+    hits.sort()
+    tails: list[int] = []
+    tail_hits: list[int] = []
+    previous: list[int] = []
+    for index, (_, other_position) in enumerate(hits):
+        rank = bisect_left(tails, other_position)
+        if rank == len(tails):
+            tails.append(other_position)
+            tail_hits.append(index)
+        else:
+            tails[rank] = other_position
+            tail_hits[rank] = index
+        previous.append(tail_hits[rank - 1] if rank else -1)
+    chain = []
+    index = tail_hits[-1] if tail_hits else -1
+    while index >= 0:
+        chain.append(hits[index])
+        index = previous[index]
+    return chain[::-1]
+
+
+class MinimizerOverlaps(OverlapEngine):
+    """
+    Suffix-prefix overlap engine for long noisy reads, comparing minimizer sketches instead of bases.
+
+    Every vertex is sketched by its (window, kmer_length) minimizers, and a dictionary maps each minimizer hash to
+    the vertices and positions holding it. A read's shared minimizers with another read are kept on the densest
+    band of diagonals and chained co-linearly. The median diagonal of the chain estimates where the other read
+    starts, and so the overlap length. Errors only cost the minimizers they touch, so allow_mis_matches is not used.
+    """
+    encoded = True
+    max_mis_matches = None
+    takes_seed_length = True
+    trie_edges_up_to = -1
+    bytes_per_read = 8000
+    bytes_per_base = 44
+    band_width = 500
+    min_chain = 3
+    microseconds_per_read = 270
+    microseconds_per_doubling = 0
+
+    def __init__(self, strands: list[bytes], seed_length: int | None = None, window: int | None = None) -> None:
+        """
+        Sketches the vertices of a list of encoded strands with minimizers of seed_length-mers (15 by default)
+        over windows of window k-mers (10 by default).
+        """
+        self.vertices: list[Vertex] = [Vertex(strands[index]) for index in _select_vertices(strands)]
+        self.vertex_ids: dict[Vertex, int] = {vertex: index for index, vertex in enumerate(self.vertices)}
+        self.kmer_length: int = seed_length or 15
+        self.window: int = window or 10
+        self.sketches: list[list[tuple[int, int]]] = []
+        self.index: dict[int, list[tuple[int, int]]] = {}
+        for vertex_id, vertex in enumerate(self.vertices):
+            sketch = _minimizers(vertex.sequence, self.kmer_length, self.window)
+            self.sketches.append(sketch)
+            for kmer_hash, position in sketch:
+                self.index.setdefault(kmer_hash, []).append((vertex_id, position))
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields, longest first, the vertices whose prefix overlaps a suffix of the given vertex according to their
+        chained minimizers together with the estimated overlap length, ignoring overlaps of at most short_overlap
+        bases and vertices contained in the given one. Equal overlaps come by decreasing chain length, then by
+        vertex order.
+        """
+        vertex_id, length = self.vertex_ids[vertex], len(vertex.sequence)
+        hits: dict[int, list[tuple[int, int]]] = {}
+        for kmer_hash, position in self.sketches[vertex_id]:
+            for other, other_position in self.index.get(kmer_hash, ()):
+                if other != vertex_id and position > other_position:
+                    hits.setdefault(other, []).append((position, other_position))
+
+        overlaps = []
+        for other, pairs in hits.items():
+            if len(pairs) < self.min_chain:
+                continue
+            bands: dict[int, int] = {}
+            for position, other_position in pairs:
+                band = (position - other_position) // self.band_width
+                bands[band] = bands.get(band, 0) + 1
+            band = max(bands, key=lambda key: bands.get(key - 1, 0) + bands[key] + bands.get(key + 1, 0))
+            chain = _colinear_chain([pair for pair in pairs
+                                     if abs((pair[0] - pair[1]) // self.band_width - band) <= 1])
+            if len(chain) < self.min_chain:
+                continue
+            offset = sorted(position - other_position for position, other_position in chain)[len(chain) // 2]
+            overlap = length - offset
+            if overlap <= short_overlap or offset + len(self.vertices[other].sequence) <= length:
+                continue
+            overlaps.append((-overlap, -len(chain), other))
+        for overlap, _, other in sorted(overlaps):
+            yield self.vertices[other], -overlap
+
+
+_HASH_MODULUS = (1 << 61) - 1
+_HASH_BASE = 1_000_003
+_hash_powers: list[int] = [1]
+
+
+def _prefix_hashes(strand: bytes) -> list[int]:
+    """
+    Returns the polynomial hashes modulo 2^61 - 1 of every prefix of an encoded strand, hashes[j] covering
+    strand[:j], and extends _hash_powers up to its length.
+    """
+    hashes = [0]
+    for code in strand:
+        hashes.append((hashes[-1] * _HASH_BASE + code + 1) % _HASH_MODULUS)
+    while len(_hash_powers) <= len(strand):
+        _hash_powers.append(_hash_powers[-1] * _HASH_BASE % _HASH_MODULUS)
+    return hashes
+
+
+def _suffix_hash(hashes: list[int], start: int) -> int:
+    """
+    Returns the polynomial hash of strand[start:] given the prefix hashes of the strand.
+    """
+    return (hashes[-1] - hashes[start] * _hash_powers[len(hashes) - 1 - start]) % _HASH_MODULUS
+
+
+class RollingHashOverlaps(OverlapEngine):
+    """
+    Exact suffix-prefix overlap engine on Rabin-Karp polynomial hashes.
+    A table maps (length, prefix hash) to the earliest vertex having that prefix. The prefix hashes of a read give
+    the hash of each of its suffixes in constant time, so a read is matched with one lookup per offset, longest
+    first, and each hit is confirmed by comparing the bases.
+    """
+    encoded = True
+    max_mis_matches = 0
+    bytes_per_read = 6000
+    bytes_per_base = 96
+    microseconds_per_read = 80
+    microseconds_per_doubling = 0
+
+    def __init__(self, strands: list[bytes]) -> None:
+        """
+        Hashes every prefix of the vertices of a list of encoded strands.
+        """
+        self.vertices: list[Vertex] = [Vertex(strands[index]) for index in _select_vertices(strands)]
+        self.hashes: dict[Vertex, list[int]] = {}
+        self.prefixes: dict[int, Vertex] = {}
+        for vertex in self.vertices:
+            hashes = self.hashes[vertex] = _prefix_hashes(vertex.sequence)
+            for length in range(1, len(hashes)):
+                self.prefixes.setdefault(length << 61 | hashes[length], vertex)
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields, longest first, the earliest vertex whose prefix equals each suffix of the given vertex together with
+        the overlap length, ignoring overlaps of at most short_overlap bases.
+        """
+        sequence, hashes = vertex.sequence, self.hashes[vertex]
+        for i in range(1, len(sequence) - short_overlap):
+            overlap = len(sequence) - i
+            match = self.prefixes.get(overlap << 61 | _suffix_hash(hashes, i))
+            if match is not None and match != vertex and match.sequence.startswith(sequence[i:]):
+                yield match, overlap
+
+
+_WIDE_HASH_BASE = 0x9E3779B97F4A7C15
+
+
+class SortMergeOverlaps(OverlapEngine):
+    """
+    Exact suffix-prefix overlap engine joining every candidate overlap at once with NumPy, which it needs.
+
+    The reads are laid out as a matrix of base codes, and the polynomial hashes of all their prefixes, modulo 2^64,
+    are computed one column at a time. For every overlap length, the prefix hashes of that length are sorted
+    stably, keeping equal hashes in vertex order, and the suffix hashes of that length are looked up in them by
+    binary search. Each suffix thus finds its earliest matching vertex through a few array operations per length.
+    The join runs on the first query, and later queries only read its results. Yielded partners are checked against
+    the reads, and a hash collision falls back to a scan of the vertices.
+    """
+    encoded = True
+    available = np is not None
+    max_mis_matches = 0
+    bytes_per_read = 100
+    bytes_per_base = 25
+    microseconds_per_read = 26
+    microseconds_per_doubling = 3
+
+    def __init__(self, strands: list[bytes]) -> None:
+        """
+        Keeps the vertices of a list of encoded strands.
+        """
+        if np is None:
+            raise ImportError("SortMergeOverlaps needs NumPy")
+        self.vertices: list[Vertex] = [Vertex(strands[index]) for index in _select_vertices(strands)]
+        self.vertex_ids: dict[Vertex, int] = {vertex: index for index, vertex in enumerate(self.vertices)}
+        self.offsets = self.partners = self.overlaps = None
+
+    def _join(self, short_overlap: int) -> None:
+        """
+        Finds, for every vertex and overlap length, the earliest other vertex whose prefix hash equals the suffix
+        hash, storing the overlaps of vertex v longest first in partners and overlaps[offsets[v]: offsets[v + 1]].
+        """
+        num_vertices = len(self.vertices)
+        lengths = np.array([len(vertex.sequence) for vertex in self.vertices], dtype=np.int64)
+        width = int(lengths.max()) if num_vertices else 0
+        codes = np.zeros((num_vertices, width), dtype=np.uint8)
+        for row, vertex in enumerate(self.vertices):
+            codes[row, :len(vertex.sequence)] = np.frombuffer(vertex.sequence, dtype=np.uint8)
+        hashes = np.zeros((num_vertices, width + 1), dtype=np.uint64)
+        base = np.uint64(_WIDE_HASH_BASE)
+        for column in range(width):
+            hashes[:, column + 1] = hashes[:, column] * base + codes[:, column]
+        del codes
+        powers = np.concatenate((np.ones(1, dtype=np.uint64), np.cumprod(np.full(width, base, dtype=np.uint64))))
+        full = hashes[np.arange(num_vertices), lengths]
+
+        found_vertices, found_partners, found_overlaps = [], [], []
+        for overlap in range(short_overlap + 1, width):
+            prefix_rows = np.flatnonzero(lengths >= overlap)
+            prefix_hashes = hashes[prefix_rows, overlap]
+            order = np.argsort(prefix_hashes, kind="stable")
+            prefix_hashes, prefix_rows = prefix_hashes[order], prefix_rows[order]
+
+            suffix_rows = np.flatnonzero(lengths > overlap)
+            suffix_hashes = full[suffix_rows] - hashes[suffix_rows, lengths[suffix_rows] - overlap] * powers[overlap]
+            positions = np.minimum(np.searchsorted(prefix_hashes, suffix_hashes), len(prefix_hashes) - 1)
+            partners = prefix_rows[positions]
+            hits = (prefix_hashes[positions] == suffix_hashes) & (partners != suffix_rows)
+            found_vertices.append(suffix_rows[hits])
+            found_partners.append(partners[hits])
+            found_overlaps.append(np.full(int(hits.sum()), overlap, dtype=np.int32))
+
+        found_vertices = np.concatenate(found_vertices or [np.zeros(0, dtype=np.int64)])
+        found_partners = np.concatenate(found_partners or [np.zeros(0, dtype=np.int64)])
+        found_overlaps = np.concatenate(found_overlaps or [np.zeros(0, dtype=np.int32)])
+        order = np.lexsort((-found_overlaps, found_vertices))
+        self.partners = found_partners[order].astype(np.int32)
+        self.overlaps = found_overlaps[order]
+        self.offsets = np.searchsorted(found_vertices[order], np.arange(num_vertices + 1))
+
+    def _scan(self, vertex: Vertex, overlap: int) -> Vertex | None:
+        """
+        Returns the earliest vertex whose prefix equals the suffix of the given vertex of the given length, unless
+        it is that vertex itself.
+        """
+        suffix = vertex.sequence[len(vertex.sequence) - overlap:]
+        for other in self.vertices:
+            if other.sequence.startswith(suffix):
+                return None if other is vertex else other
+        return None
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields, longest first, the earliest vertex whose prefix equals each suffix of the given vertex together with
+        the overlap length, ignoring overlaps of at most short_overlap bases.
+        """
+        if self.offsets is None:
+            self._join(short_overlap)
+        vertex_id, sequence = self.vertex_ids[vertex], vertex.sequence
+        start, end = int(self.offsets[vertex_id]), int(self.offsets[vertex_id + 1])
+        for partner, overlap in zip(self.partners[start: end].tolist(), self.overlaps[start: end].tolist()):
+            if overlap <= short_overlap:
+                break
+            other = self.vertices[partner]
+            if not sequence.endswith(other.sequence[:overlap]):
+                other = self._scan(vertex, overlap)
+            if other is not None:
+                yield other, overlap
+
+
+class HammingVariantOverlaps(OverlapEngine):
+    """
+    Suffix-prefix overlap engine for at most one mismatch, indexing the Hamming neighbourhood of prefix seeds.
+    The first seed_length bases of every vertex are indexed together with all their single-substitution variants.
+    Any overlap within one mismatch then has a seed one exact lookup away, and candidates are verified over the
+    whole packed overlap. This costs 3 * seed_length + 1 index entries per vertex and one lookup per offset.
+    """
+    encoded = True
+    max_mis_matches = 1
+    takes_seed_length = True
+    bytes_per_read = 5700
+    bytes_per_base = 0
+    microseconds_per_read = 74
+    microseconds_per_doubling = 12
+
+    def __init__(self, strands: list[bytes], seed_length: int | None = None) -> None:
+        """
+        Indexes the seed neighbourhoods of the vertices of a list of encoded strands. seed_length defaults to one
+        more than the shortest overlap ignored by the graph, so that every overlap covers a whole seed.
+        """
+        self.vertices: list[Vertex] = [Vertex(strands[index]) for index in _select_vertices(strands)]
+        self.vertex_ids: dict[Vertex, int] = {vertex: index for index, vertex in enumerate(self.vertices)}
+        self.packed: list[int] = [pack_strand(vertex.sequence) for vertex in self.vertices]
+        self.seed_length: int = seed_length or 2 * int(math.log(len(strands), 4)) + 1
+        self.index: dict[bytes, list[int]] = {}
+        for vertex_id, vertex in enumerate(self.vertices):
+            if len(vertex.sequence) >= self.seed_length:
+                for key in self._index_keys(vertex.sequence[:self.seed_length]):
+                    self.index.setdefault(key, []).append(vertex_id)
+
+    @staticmethod
+    def _index_keys(seed: bytes) -> list[bytes]:
+        """
+        Returns the keys a vertex is indexed under: its seed and every single-substitution variant of it.
+        """
+        keys = [seed]
+        for position, code in enumerate(seed):
+            keys.extend(seed[:position] + bytes((other,)) + seed[position + 1:] for other in range(4) if other != code)
+        return keys
+
+    @staticmethod
+    def _query_keys(seed: bytes) -> list[bytes]:
+        """
+        Returns the keys looked up for a suffix starting with the given seed.
+        """
+        return [seed]
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields the overlaps of OverlapEngine.iter_overlaps whose first seed_length bases are within one substitution.
+        """
+        sequence, seed_length = vertex.sequence, self.seed_length
+        vertex_id = self.vertex_ids[vertex]
+        for i in range(1, len(sequence) - max(short_overlap, seed_length - 1)):
+            overlap = len(sequence) - i
+            suffix = self.packed[vertex_id] >> 2 * i
+            candidates = set()
+            for key in self._query_keys(sequence[i: i + seed_length]):
+                candidates.update(self.index.get(key, ()))
+            best, best_mismatches = None, allow_mis_matches + 1
+            for candidate in sorted(candidates):
+                if len(self.vertices[candidate].sequence) < overlap:
+                    continue
+                mismatches = packed_mismatches(suffix, self.packed[candidate], overlap)
+                if mismatches < best_mismatches:
+                    best, best_mismatches = candidate, mismatches
+                    if mismatches == 0:
+                        break
+            if best is not None and best != vertex_id:
+                yield self.vertices[best], overlap
+
+
+class HammingMaskedOverlaps(HammingVariantOverlaps):
+    """
+    HammingVariantOverlaps indexing masked signatures instead of variants: each seed is stored once per position,
+    with that position replaced by a wildcard, and a query looks up every masked signature of its own seed.
+    This costs seed_length index entries per vertex and seed_length lookups per offset.
+    """
+    bytes_per_read = 2000
+    microseconds_per_read = 225
+    microseconds_per_doubling = 30
+
+    @staticmethod
+    def _index_keys(seed: bytes) -> list[bytes]:
+        """
+        Returns the seed masked at each position in turn.
+        """
+        return [seed[:position] + b"\x04" + seed[position + 1:] for position in range(len(seed))]
+
+    _query_keys = _index_keys
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of trie searches keyed on the searched strand and the mismatch budget, counting its hits and
+    misses. Useful at high coverage, where duplicate reads send identical suffix queries to the trie.
+    """
+    def __init__(self, search: Callable[[str | bytes, int], Vertex | None], max_size: int) -> None:
+        """
+        Initializes an empty cache in front of the given search function, holding at most max_size results.
+        """
+        self.search_function = search
+        self.max_size: int = max_size
+        self.entries: OrderedDict[tuple[str | bytes, int], Vertex | None] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def search(self, strand: str | bytes, allow_mis_matches: int = 0) -> Vertex | None:
+        """
+        Returns the cached result of searching the strand, searching and caching it on a miss and evicting the
+        least recently used result when the cache is full.
+        """
+        key = (strand, allow_mis_matches)
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        match = entries[key] = self.search_function(strand, allow_mis_matches)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+        return match
+
+
+class TrieOverlapEngine(OverlapEngine):
+    """
+    Overlap engine searching a prefix trie, one of TRIE_BACKENDS, with every suffix of a read, longest first.
+    With failure_links, exact searches find all the suffix-prefix overlaps of a read in a single Aho-Corasick scan
+    instead. With best_first, mismatch-tolerant searches return the match needing the fewest mismatches instead of
+    the first one found. A positive cache_size puts a QueryCache of that size in front of them.
+    The memory estimate is that of the default object trie.
+    """
+    trie_edges_up_to = None
+    bytes_per_read = 0
+    bytes_per_base = 146
+    microseconds_per_read = 110
+    microseconds_per_doubling = 8
+    mismatch_slowdown = 1.5
+
+    def __init__(self, trie, vertices: list[Vertex], best_first: bool = False, cache_size: int = 0,
+                 failure_links: bool = False) -> None:
+        """
+        Wraps a trie holding the given vertices.
+        """
+        self.trie = trie
+        self.vertices: list[Vertex] = vertices
+        self.best_first: bool = best_first
+        self.failure_links: bool = failure_links
+        self.cache: QueryCache | None = None
+        if cache_size:
+            self.cache = QueryCache(trie.best_first_search if best_first else trie.search, cache_size)
+
+    @classmethod
+    def build(cls, strands: list[str], trie_backend: str = "object", best_first: bool = False, cache_size: int = 0,
+              bulk_load: bool = False, max_depth: int | None = None, index_path: str | None = None,
+              failure_links: bool = False) -> 'TrieOverlapEngine':
+        """
+        Builds a trie_backend trie over a list of DNA strands, encoding them first for backends working on base
+        codes. bulk_load builds the trie from the sorted strands instead of inserting them one by one, for backends
+        providing a bulk loader. max_depth caps the depth of an array trie, verifying longer overlaps against the
+        reads. index_path names an on-disk array trie: it is memory-mapped if it indexes exactly these strands, and
+        written after building the trie otherwise. failure_links needs the object or array backend without
+        max_depth.
+        """
+        trie_class = TRIE_BACKENDS[trie_backend]
+        if trie_class.encoded:
+            strands = [encode_strand(strand) for strand in strands]
+
+        if max_depth is not None and (trie_class is not ArrayTrie or bulk_load):
+            raise ValueError("max_depth is only supported by the array trie backend without bulk loading")
+        if index_path is not None and (trie_class is not ArrayTrie or max_depth is not None):
+            raise ValueError("index_path is only supported by the array trie backend without max_depth")
+        if failure_links and (not hasattr(trie_class, "build_failure_links") or max_depth is not None):
+            raise ValueError("failure_links is only supported by the object and array trie backends without max_depth")
+
+        if index_path is not None:
+            digest = _strands_digest(strands)
+            if os.path.exists(index_path):
+                trie = ArrayTrie.load(index_path)
+                if trie.digest == digest:
+                    return cls(trie, list(trie.vertices), best_first, cache_size, failure_links)
+
+        if bulk_load:
+            if not hasattr(trie_class, "bulk_load"):
+                raise ValueError(f"The {trie_backend} trie backend has no bulk loader")
+            trie = trie_class.bulk_load(strands)
+            vertices = list(trie.vertices)
+        else:
+            trie = trie_class() if max_depth is None else ArrayTrie(max_depth)
+            vertices = []
+            for strand in strands:
+                vertex = trie.insert_strand(strand)
+                if vertex is not None:
+                    vertex.sequence = strand
+                    vertices.append(vertex)
+
+        if index_path is not None:
+            if failure_links:
+                trie.build_failure_links()
+            trie.save(index_path, digest, len(strands))
+        return cls(trie, vertices, best_first, cache_size, failure_links)
+
+    def iter_overlaps(self, vertex: Vertex, allow_mis_matches: int, short_overlap: int) -> Iterator[tuple[Vertex, int]]:
+        """
+        Yields, longest first, the vertex the trie search returns for each suffix of the given vertex together with
+        the overlap length, ignoring overlaps of at most short_overlap bases.
+        """
+        trie, sequence = self.trie, vertex.sequence
+        if self.failure_links and not allow_mis_matches:
+            if trie.fail is None:
+                trie.build_failure_links()
+            for overlap, match in trie.suffix_matches(sequence):
+                if overlap <= short_overlap:
+                    break
+                if overlap < len(sequence) and match != vertex:
+                    yield match, overlap
+            return
+
+        for i in range(1, len(sequence) - short_overlap):
+            if self.cache is not None:
+                match = self.cache.search(sequence[i:], allow_mis_matches)
+            elif self.best_first:
+                match = trie.best_first_search(sequence, allow_mis_matches, i)
+            else:
+                match = trie.search(sequence[i:], allow_mis_matches)
+            if match and match != vertex:
+                yield match, len(sequence) - i
+
+    def add_strands(self, strands: list[str]) -> list[Vertex]:
+        """
+        Inserts DNA strands into the trie, returning the vertices of those that are not a prefix of an earlier
+        strand. The failure links and cached queries are dropped, since the insertions outdate them, and later
+        searches go offset by offset instead of rebuilding the links for the whole trie. Memory-mapped tries are
+        read-only and raise ValueError.
+        """
+        trie = self.trie
+        if getattr(trie, "mapping", None) is not None:
+            raise ValueError("A memory-mapped trie cannot add strands")
+        if trie.encoded:
+            strands = [encode_strand(strand) for strand in strands]
+
+        new_vertices = []
+        for strand in strands:
+            vertex = trie.insert_strand(strand)
+            if vertex is not None:
+                vertex.sequence = strand
+                new_vertices.append(vertex)
+        self.vertices.extend(new_vertices)
+
+        if hasattr(trie, "build_failure_links"):
+            trie.fail = None
+            if hasattr(trie, "depths"):
+                trie.depths = None
+        self.failure_links = False
+        if self.cache is not None:
+            self.cache.entries.clear()
+        return new_vertices
+
+
+OVERLAP_ENGINES = {"trie": TrieOverlapEngine, "suffix_array": SuffixArrayOverlaps, "fm_index": FMIndexOverlaps,
+                   "kmer": KmerSeedOverlaps, "pigeonhole": PigeonholeOverlaps, "minimizer": MinimizerOverlaps,
+                   "sort_merge": SortMergeOverlaps, "rolling_hash": RollingHashOverlaps,
+                   "hamming_variants": HammingVariantOverlaps, "hamming_masked": HammingMaskedOverlaps}
+
+_LONG_READ_LENGTH = 1000
+
+
+def select_overlap_engine(num_strands: int, read_length: int, allow_mis_matches: int,
+                          memory_budget: int | None = None, seed_length: int | None = None,
+                          window: int | None = None, max_edits: int | None = None) -> str:
+    """
+    Returns the name of the overlap engine expected to be fastest, by time_estimate, for num_strands reads of
+    read_length bases, among those whose memory_estimate fits memory_budget bytes and that find the same edges as the
+    trie engine for allow_mis_matches. Without mismatches, that is any engine but the minimizer one. With
+    mismatches, it is only the trie engine. If none of them fits, the fastest other engine that fits is returned,
+    or else the one with the smallest estimate. Long reads go to the minimizer engine. Any engine finding other
+    edges than the trie is returned with a warning that it changes the results. Only engines accepting seed_length,
+    window and max_edits are considered when they are given, as in build_overlap_engine, and ValueError is raised
+    if there are none.
+    """
+    engines = [name for name, engine_class in OVERLAP_ENGINES.items() if engine_class.available and
+               (engine_class.max_mis_matches is None or allow_mis_matches <= engine_class.max_mis_matches) and
+               (seed_length is None or engine_class.takes_seed_length) and (window is None or name == "minimizer")
+               and (max_edits is None or engine_class.supports_edits)]
+    if not engines:
+        raise ValueError("No overlap engine accepts these options")
+    same_edges = [name for name in engines if OVERLAP_ENGINES[name].trie_edges_up_to is None or
+                  allow_mis_matches <= OVERLAP_ENGINES[name].trie_edges_up_to]
+
+    def estimate(name: str) -> int:
+        return OVERLAP_ENGINES[name].memory_estimate(num_strands, read_length, allow_mis_matches)
+
+    def seconds(name: str) -> float:
+        return OVERLAP_ENGINES[name].time_estimate(num_strands, read_length, allow_mis_matches)
+
+    if read_length >= _LONG_READ_LENGTH and "minimizer" in engines:
+        choice = "minimizer"
+    else:
+        fitting = [name for name in engines if memory_budget is None or estimate(name) <= memory_budget]
+        if fitting:
+            choice = min((name for name in fitting if name in same_edges), key=seconds, default=None)
+            choice = choice or min(fitting, key=seconds)
+        else:
+            choice = min(engines, key=estimate)
+    if choice not in same_edges:
+        warnings.warn(f"the {choice} overlap engine finds other edges than the trie engine with "
+                      f"{allow_mis_matches} mismatches, which changes the results", stacklevel=2)
+    return choice
+
+
+def pack_vertices(vertices: Iterable[Vertex]) -> dict[Vertex, int]:
+    """
+    Returns the packed strand (see pack_strand) of every vertex, encoding string sequences first.
+    """
+    return {vertex: pack_strand(vertex.sequence if isinstance(vertex.sequence, bytes)
+                                else encode_strand(vertex.sequence)) for vertex in vertices}
+
+
+def edge_mismatches(packed: dict[Vertex, int], vertex: Vertex, match: Vertex, overlap: int) -> int:
+    """
+    Counts the mismatches between the suffix of vertex and the prefix of match of the given overlap length, both
+    packed in packed. Overlaps found by edit distance or estimated from minimizers are compared ungapped.
+    """
+    length = len(vertex.sequence)
+    compared = min(overlap, length, len(match.sequence))
+    return packed_mismatches(packed[vertex] >> 2 * (length - compared), packed[match], compared)
+
+
+def find_edges(engine: OverlapEngine, packed: dict[Vertex, int], vertex: Vertex, allow_mis_matches: int,
+               short_overlap: int, mismatch_levels: bool = False) -> list[tuple[Vertex, int, int]]:
+    """
+    Returns the (match, overlap, mismatches) edges of a vertex, longest first. Without mismatch_levels, this is the
+    longest overlap the engine finds. With mismatch_levels, the engine is queried again with one mismatch fewer than
+    the last edge needed, down to none, keeping the longest overlap each query finds that is no longer than the last
+    edge. The same partner cannot return, but another one of the same length needing fewer mismatches can. The first
+    edge within any smaller allowance is then the one a graph built with that allowance would have.
+    """
+    edges = []
+    allowance = allow_mis_matches
+    while allowance >= 0:
+        shorter = ((match, overlap) for match, overlap in engine.iter_overlaps(vertex, allowance, short_overlap)
+                   if not edges or overlap <= edges[-1][1])
+        match, overlap = next(shorter, (None, 0))
+        if match is None:
+            break
+        mismatches = edge_mismatches(packed, vertex, match, overlap)
+        edges.append((match, overlap, mismatches))
+        if not mismatch_levels:
+            break
+        allowance = min(allowance, mismatches) - 1
+    return edges
+
+
+def first_edge_within(edges: list[tuple[Vertex, int, int]],
+                      allow_mis_matches: int | None) -> tuple[Vertex, int, int] | None:
+    """
+    Returns the first of the edges needing at most allow_mis_matches mismatches, or the first edge if
+    allow_mis_matches is None.
+    """
+    for edge in edges:
+        if allow_mis_matches is None or edge[2] <= allow_mis_matches:
+            return edge
+    return None
+
+
+_worker_state: tuple | None = None
+
+
+def _connect_chunk(bounds: tuple[int, int]) -> list[tuple[int, list[tuple[int, int, int]]]]:
+    """
+    Returns the (vertex index, [(partner index, overlap, mismatches), ...]) edges of a range of vertices, found with
+    the engine a forked worker inherited through _worker_state.
+    """
+    engine, packed, vertices, vertex_ids, allow_mis_matches, short_overlap, mismatch_levels = _worker_state
+    edges = []
+    for index in range(*bounds):
+        found = find_edges(engine, packed, vertices[index], allow_mis_matches, short_overlap, mismatch_levels)
+        if found:
+            edges.append((index, [(vertex_ids[match], overlap, mismatches)
+                                  for match, overlap, mismatches in found]))
+    return edges
+
+
+def build_overlap_engine(strands: list[str], allow_mis_matches: int, overlap_engine: str = "trie",
+                         trie_backend: str = "object", best_first: bool = False, cache_size: int = 0,
+                         bulk_load: bool = False, max_depth: int | None = None, index_path: str | None = None,
+                         seed_length: int | None = None, window: int | None = None,
+                         max_edits: int | None = None, failure_links: bool = False) -> OverlapEngine:
+    """
+    Builds the engine named overlap_engine in OVERLAP_ENGINES over a list of DNA strands, checking that it supports
+    allow_mis_matches. trie_backend, best_first, cache_size, bulk_load, max_depth, index_path and failure_links
+    configure the trie engine (see TrieOverlapEngine.build) and are ignored by the others. seed_length sets the
+    k-mer length of the kmer, minimizer and hamming engines, and window the minimizer window. max_edits makes engines supporting edits
+    accept overlaps within that many substitutions, insertions and deletions instead of allow_mis_matches
+    substitutions.
+    """
+    engine_class = OVERLAP_ENGINES[overlap_engine]
+    if seed_length is not None and not engine_class.takes_seed_length:
+        raise ValueError("seed_length is only supported by the kmer, minimizer and hamming overlap engines")
+    if window is not None and overlap_engine != "minimizer":
+        raise ValueError("window is only supported by the minimizer overlap engine")
+
+    if max_edits is not None and not engine_class.supports_edits:
+        raise ValueError(f"{engine_class.__name__} does not support max_edits")
+    if engine_class.max_mis_matches is not None and allow_mis_matches > engine_class.max_mis_matches:
+        raise ValueError(f"{engine_class.__name__} allows at most {engine_class.max_mis_matches} mismatches")
+    if engine_class is TrieOverlapEngine:
+        options = dict(trie_backend=trie_backend, best_first=best_first, cache_size=cache_size,
+                       bulk_load=bulk_load, max_depth=max_depth, index_path=index_path, failure_links=failure_links)
+    else:
+        options = {key: value for key, value in (("seed_length", seed_length), ("window", window),
+                                                 ("max_edits", max_edits)) if value is not None}
+    return engine_class.build(strands, **options)
+
+
+class Graph:
+    """
+    Represents an overlap graph where nodes are genome read vertices and edges represent overlaps.
+    """
+    def __init__(self) -> None:
+        """
+        Initializes an empty Graph. Loading it keeps the overlap engine, so that add_strands can extend it.
+        """
+        self.vertices: dict[Vertex, None] = {}
+        self.engine: OverlapEngine | None = None
+        self.packed: dict[Vertex, int] = {}
+        self.allow_mis_matches: int = 0
+        self.mismatch_levels: bool = False
+        self.num_strands: int = 0
+
+    def load_from_strands(self, strands: list[str], allow_mis_matches: int, trie_backend: str = "object",
+                          best_first: bool = False, cache_size: int = 0, bulk_load: bool = False,
+                          max_depth: int | None = None, index_path: str | None = None,
+                          overlap_engine: str = "trie", seed_length: int | None = None,
+                          window: int | None = None, max_edits: int | None = None, workers: int = 1,
+                          mismatch_levels: bool = False, failure_links: bool = False) -> None:
+        """
+        Constructs the overlap graph from a list of DNA strands, finding overlaps with the engine named
+        overlap_engine in OVERLAP_ENGINES and configured by the remaining options (see build_overlap_engine).
+        See _connect_vertices for workers and find_edges for mismatch_levels, which lets get_sequenced_result
+        assemble the graph for any allowance up to allow_mis_matches.
+        """
+        engine = build_overlap_engine(strands, allow_mis_matches, overlap_engine, trie_backend=trie_backend,
+                                      best_first=best_first, cache_size=cache_size, bulk_load=bulk_load,
+                                      max_depth=max_depth, index_path=index_path, seed_length=seed_length,
+                                      window=window, max_edits=max_edits, failure_links=failure_links)
+        self.vertices.update(dict.fromkeys(engine.vertices))
+        self.engine, self.allow_mis_matches, self.num_strands = engine, allow_mis_matches, len(strands)
+        self.mismatch_levels = mismatch_levels
+        self._connect_vertices(engine, len(strands), allow_mis_matches, workers)
+
+    def load_from_index(self, index_path: str, allow_mis_matches: int, best_first: bool = False,
+                        cache_size: int = 0, workers: int = 1, mismatch_levels: bool = False,
+                        failure_links: bool = False) -> None:
+        """
+        Constructs the overlap graph from an array trie saved by load_from_strands, memory-mapping it instead of
+        re-inserting the reads.
+        """
+        trie = ArrayTrie.load(index_path)
+        engine = TrieOverlapEngine(trie, list(trie.vertices), best_first, cache_size, failure_links)
+        self.vertices.update(dict.fromkeys(engine.vertices))
+        self.engine, self.allow_mis_matches, self.num_strands = engine, allow_mis_matches, trie.num_strands
+        self.mismatch_levels = mismatch_levels
+        self._connect_vertices(engine, trie.num_strands, allow_mis_matches, workers)
+
+    def add_strands(self, strands: list[str]) -> None:
+        """
+        Adds DNA strands to a graph built by load_from_strands or load_from_index, inserting them into its overlap
+        engine instead of rebuilding it. The new vertices get their outgoing overlaps, and an existing vertex is
+        reconnected when the new strands give it a longer overlap than its current one, or one as long needing fewer
+        mismatches (at any mismatch level kept, with mismatch_levels). Only the vertices a new strand improves are
+        searched again (see _improved_vertices). If the extra strands raise the shortest meaningful overlap, every
+        vertex is reconnected. Only the trie engine can add strands.
+        """
+        if self.engine is None:
+            raise ValueError("add_strands needs a graph built by load_from_strands or load_from_index")
+        existing = list(self.vertices.keys())
+        new_vertices = self.engine.add_strands(strands)
+        self.vertices.update(dict.fromkeys(new_vertices))
+        self.packed.update(pack_vertices(new_vertices))
+
+        previous_short_overlap = 2 * int(math.log(self.num_strands, 4))
+        self.num_strands += len(strands)
+        short_overlap = 2 * int(math.log(self.num_strands, 4))
+        if short_overlap != previous_short_overlap:
+            for vertex in existing:
+                vertex.connected_vertices.clear()
+            self._connect_vertices(self.engine, self.num_strands, self.allow_mis_matches)
+            return
+
+        for vertex in new_vertices:
+            vertex.connected_vertices.extend(find_edges(self.engine, self.packed, vertex, self.allow_mis_matches,
+                                                        short_overlap, self.mismatch_levels))
+        improved = self._improved_vertices(existing, new_vertices, short_overlap)
+        for vertex in existing:
+            if vertex not in improved:
+                continue
+            edges = vertex.connected_vertices
+            # New partners as long as a kept edge are searched too, since they may need fewer mismatches.
+            if self.mismatch_levels:
+                # Overlaps shorter than an edge needing no mismatches can never join the levels.
+                current = edges[-1][1] - 1 if edges and edges[-1][2] == 0 else short_overlap
+            else:
+                current = edges[0][1] - 1 if edges else short_overlap
+            candidates = find_edges(self.engine, self.packed, vertex, self.allow_mis_matches, current,
+                                    self.mismatch_levels)
+            if candidates:
+                merged = []
+                for edge in sorted(edges + candidates, key=lambda edge: (-edge[1], edge[2])):
+                    if not merged or edge[1] < merged[-1][1] and edge[2] < merged[-1][2]:
+                        merged.append(edge)
+                edges[:] = merged if self.mismatch_levels else merged[:1]
+
+    def _improved_vertices(self, existing: list[Vertex], new_vertices: list[Vertex],
+                           short_overlap: int) -> set[Vertex]:
+        """
+        Returns the existing vertices that one of the new vertices overlaps better than the edge they keep for the
+        mismatches this overlap needs (their only edge, without mismatch_levels). The prefix of such a partner
+        needing m mismatches splits into m + 1 disjoint seeds, one of which the suffix holds exactly, so only the new
+        vertices sharing a seed with a suffix are compared. Seeds are short_overlap + 1 bases long, or shorter for
+        edges too short to hold m + 1 of them.
+        """
+        allowances = range(self.allow_mis_matches + 1) if self.mismatch_levels else [self.allow_mis_matches]
+        seed_length = short_overlap + 1
+        improved, seed_indexes = set(), {}
+        for vertex in existing:
+            # Seed j only serves the allowances of j mismatches or more, below the offset ends[j].
+            ends = [1] * (self.allow_mis_matches + 1)
+            for allowance in allowances:
+                edge = first_edge_within(vertex.connected_vertices, allowance if self.mismatch_levels else None)
+                shortest = edge[1] if edge else seed_length
+                end = len(vertex.sequence) - shortest + 1
+                if shortest >= (allowance + 1) * seed_length:
+                    ends[:allowance + 1] = [max(old_end, end) for old_end in ends[:allowance + 1]]
+                elif self._improved_by(vertex, new_vertices, seed_indexes, shortest // (allowance + 1),
+                                       [end] * (allowance + 1)):
+                    improved.add(vertex)
+                    break
+            else:
+                if self._improved_by(vertex, new_vertices, seed_indexes, seed_length, ends):
+                    improved.add(vertex)
+        return improved
+
+    def _improved_by(self, vertex: Vertex, new_vertices: list[Vertex],
+                     seed_indexes: dict[tuple[int, int], list[dict[str | bytes, list[Vertex]]]], seed_length: int,
+                     ends: list[int]) -> bool:
+        """
+        Tells whether a new vertex whose j-th seed of seed_length bases matches the suffix of the vertex starting at
+        an offset below ends[j] at the same place improves the vertex (see _improves). seed_indexes caches the seeds
+        of the new vertices.
+        """
+        index = seed_indexes.get((seed_length, len(ends)))
+        if index is None:
+            index = seed_indexes[seed_length, len(ends)] = [{} for _ in ends]
+            for new_vertex in new_vertices:
+                for j, seeds in enumerate(index):
+                    seeds.setdefault(new_vertex.sequence[j * seed_length:(j + 1) * seed_length], []).append(new_vertex)
+
+        sequence = vertex.sequence
+        for j, (seeds, end) in enumerate(zip(index, ends)):
+            start, stop = 1 + j * seed_length, end + j * seed_length
+            # The set intersection finds the few shared seeds without a loop over the offsets.
+            shared = seeds.keys() & map(sequence.__getitem__, map(slice, range(start, stop),
+                                                                 range(start + seed_length, stop + seed_length)))
+            for seed in shared:
+                position = sequence.find(seed, start, stop + seed_length - 1)
+                while position != -1:
+                    overlap = len(sequence) - position + j * seed_length
+                    if any(self._improves(vertex, new_vertex, overlap) for new_vertex in seeds[seed]):
+                        return True
+                    position = sequence.find(seed, position + 1, stop + seed_length - 1)
+        return False
+
+    def _improves(self, vertex: Vertex, new_vertex: Vertex, overlap: int) -> bool:
+        """
+        Tells whether new_vertex overlaps vertex by overlap bases within allow_mis_matches mismatches, better than
+        the edge the vertex keeps for the mismatches needed.
+        """
+        if len(new_vertex.sequence) < overlap:
+            return False
+        mismatches = edge_mismatches(self.packed, vertex, new_vertex, overlap)
+        if mismatches > self.allow_mis_matches:
+            return False
+        edge = first_edge_within(vertex.connected_vertices, mismatches if self.mismatch_levels else None)
+        return edge is None or (overlap, -mismatches) > (edge[1], -edge[2])
+
+    def _connect_vertices(self, engine: OverlapEngine, num_strands: int, allow_mis_matches: int,
+                          workers: int = 1) -> None:
+        """
+        Connects every vertex to the vertex with the longest prefix matching one of its suffixes according to the
+        overlap engine, ignoring overlaps too short to be meaningful among num_strands reads, and annotates each
+        edge with the mismatches it needs (see find_edges). With several workers on a platform that can fork, the
+        vertices are split into chunks searched by a pool of forked processes, which share the engine copy-on-write.
+        Query cache statistics then only cover the first vertex.
+        """
+        short_overlap = 2 * int(math.log(num_strands, 4))
+        self.packed = pack_vertices(self.vertices.keys())
+        if workers > 1 and len(self.vertices) > 1 and "fork" in multiprocessing.get_all_start_methods():
+            self._connect_in_workers(engine, allow_mis_matches, short_overlap, workers)
+        else:
+            for vertex in self.vertices.keys():
+                vertex.connected_vertices.extend(find_edges(engine, self.packed, vertex, allow_mis_matches,
+                                                            short_overlap, self.mismatch_levels))
+
+        cache = getattr(engine, "cache", None)
+        if cache is not None and cache.hits + cache.misses:
+            count("query cache hits", cache.hits)
+            count("query cache misses", cache.misses)
+
+    def _connect_in_workers(self, engine: OverlapEngine, allow_mis_matches: int, short_overlap: int,
+                            workers: int) -> None:
+        """
+        Connects the vertices in a pool of forked processes. The first vertex is connected here, so that engines
+        building structures on their first query build them once, before the fork.
+        """
+        global _worker_state
+        vertices = list(self.vertices.keys())
+        vertices[0].connected_vertices.extend(find_edges(engine, self.packed, vertices[0], allow_mis_matches,
+                                                         short_overlap, self.mismatch_levels))
+
+        _worker_state = (engine, self.packed, vertices, {vertex: index for index, vertex in enumerate(vertices)},
+                         allow_mis_matches, short_overlap, self.mismatch_levels)
+        size = -(-(len(vertices) - 1) // (8 * workers))
+        chunks = [(start, min(start + size, len(vertices))) for start in range(1, len(vertices), size)]
+        try:
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                for edges in pool.imap(_connect_chunk, chunks):
+                    for index, found in edges:
+                        vertices[index].connected_vertices.extend(
+                            (vertices[partner], overlap, mismatches) for partner, overlap, mismatches in found)
+        finally:
+            _worker_state = None
+
+    def get_sequenced_result(self, min_overlap: int = 0, in_coming_links_min: int = 0,
+                             allow_mis_matches: int | None = None) -> str:
+        """
+        Traverses the overlap graph to generate the assembled genome sequence. Vertices holding base codes are
+        assembled as codes and decoded only once for the final contig. With allow_mis_matches, the traversal only
+        follows edges needing at most that many mismatches, as if the graph had been built with that allowance.
+        """
+        best_edges = {vertex: first_edge_within(vertex.connected_vertices, allow_mis_matches)
+                      for vertex in self.vertices.keys()}
+        incoming_links_values = {v: 0 for v in self.vertices.keys()}
+        
+        for edge in best_edges.values():
+            if edge is not None:
+                edge_end, match_length, _ = edge
+                incoming_links_values[edge_end] += match_length
+
+        max_seq = ""
+
+        for origin, sum_incoming_links in incoming_links_values.items():
+            if sum_incoming_links > in_coming_links_min:
+                continue
+                
+            current = origin
+            sequence = current.sequence
+            i = 0
+            while best_edges[current] is not None and i < len(self.vertices):
+                next_vertex, overlap_size, _ = best_edges[current]
+                if overlap_size < min_overlap:
+                    break
+                
+                sequence += next_vertex.sequence[overlap_size:]
+                current = next_vertex
+                i += 1
+            
+            if len(sequence) > len(max_seq):
+                max_seq = sequence
+
+        return decode_strand(max_seq) if isinstance(max_seq, bytes) else max_seq
+
+
+class CompactGraph:
+    """
+    Overlap graph whose vertices are integer ids, in read order, and whose edges are stored CSR-style in array
+    columns. The edges of vertex v are targets, overlaps and mismatches[offsets[v]: offsets[v + 1]], best first,
+    which costs 12 bytes per edge and 8 per vertex. mismatches counts the differing bases of the ungapped overlap.
+    Up to top_k overlaps are kept per vertex.
+    """
+    def __init__(self) -> None:
+        """
+        Initializes an empty CompactGraph.
+        """
+        self.sequences: list[str | bytes] = []
+        self.offsets: array = array("q", [0])
+        self.targets: array = array("i")
+        self.overlaps: array = array("i")
+        self.mismatches: array = array("I")
+
+    def __len__(self) -> int:
+        """
+        Returns the number of vertices.
+        """
+        return len(self.sequences)
+
+    def load_from_strands(self, strands: list[str], allow_mis_matches: int, top_k: int = 1, **options) -> None:
+        """
+        Constructs the graph from a list of DNA strands, keeping the top_k longest overlaps of every vertex. The
+        options select and configure the overlap engine as in build_overlap_engine.
+        """
+        engine = build_overlap_engine(strands, allow_mis_matches, **options)
+        vertices = engine.vertices
+        vertex_ids = {vertex: index for index, vertex in enumerate(vertices)}
+        packed = pack_vertices(vertices)
+        short_overlap = 2 * int(math.log(len(strands), 4))
+
+        self.sequences = [vertex.sequence for vertex in vertices]
+        for vertex in vertices:
+            for match, overlap in islice(engine.iter_overlaps(vertex, allow_mis_matches, short_overlap), top_k):
+                self.targets.append(vertex_ids[match])
+                self.overlaps.append(overlap)
+                self.mismatches.append(edge_mismatches(packed, vertex, match, overlap))
+            self.offsets.append(len(self.targets))
+
+    def edges(self, vertex_id: int) -> Iterator[tuple[int, int, int]]:
+        """
+        Yields the (target id, overlap, mismatches) edges of a vertex, best first.
+        """
+        start, end = self.offsets[vertex_id], self.offsets[vertex_id + 1]
+        return zip(self.targets[start: end], self.overlaps[start: end], self.mismatches[start: end])
+
+    def get_sequenced_result(self, min_overlap: int = 0, in_coming_links_min: int = 0,
+                             allow_mis_matches: int | None = None) -> str:
+        """
+        Traverses the graph along the best edge of every vertex to generate the assembled genome sequence, the same
+        way Graph.get_sequenced_result does. With allow_mis_matches, the best edge is the first one needing at most
+        that many mismatches.
+        """
+        targets, overlaps = self.targets, self.overlaps
+        best = array("q", [-1]) * len(self.sequences)
+        incoming = [0] * len(self.sequences)
+        for vertex_id in range(len(self.sequences)):
+            for edge in range(self.offsets[vertex_id], self.offsets[vertex_id + 1]):
+                if allow_mis_matches is None or self.mismatches[edge] <= allow_mis_matches:
+                    best[vertex_id] = edge
+                    incoming[targets[edge]] += overlaps[edge]
+                    break
+
+        max_seq = ""
+        for origin, sum_incoming_links in enumerate(incoming):
+            if sum_incoming_links > in_coming_links_min:
+                continue
+            current = origin
+            sequence = self.sequences[current]
+            i = 0
+            while best[current] >= 0 and i < len(self.sequences):
+                overlap = overlaps[best[current]]
+                if overlap < min_overlap:
+                    break
+                current = targets[best[current]]
+                sequence += self.sequences[current][overlap:]
+                i += 1
             if len(sequence) > len(max_seq):
                 max_seq = sequence
 
-        return max_seq
+        return decode_strand(max_seq) if isinstance(max_seq, bytes) else max_seq